@@ -5,30 +5,639 @@ Created on Fri Mar  5 10:51:26 2021
 
 @author: anna
 """
+import functools
+import json
 import matplotlib.pyplot as plt
 import numpy as np
 import math
+import os
 import pandas as pd
 import seaborn as sns
 import sys
+import threading
 import time
 import warnings
 import hoggorm as ho
 import hoggormplot as hopl
 
 from abc import ABC, abstractmethod
-from itertools import combinations, combinations_with_replacement
-from joblib import Parallel, delayed
+from joblib import Parallel, delayed, effective_n_jobs
+from joblib import hash as hash_object
 
+from sklearn.exceptions import ConvergenceWarning
 from sklearn.linear_model import LogisticRegression, ElasticNet, \
-    LinearRegression
+    LinearRegression, enet_path
 from sklearn.metrics import f1_score, precision_score, recall_score, \
                             matthews_corrcoef, r2_score, accuracy_score, \
                             log_loss
 from sklearn.model_selection import train_test_split, StratifiedKFold, KFold
-from sklearn.preprocessing import PolynomialFeatures, StandardScaler
+from sklearn.preprocessing import StandardScaler
 
-from scipy.stats import t
+from scipy import linalg, sparse
+from scipy.special import expit
+from scipy.stats import norm, t
+
+
+class _PolynomialNames:
+    """
+    Lazy sequence of feature names of a ``_PolynomialDesign``. Names are only
+    built when they are accessed, e.g. when a dataframe is returned.
+    
+    PARAMETERS
+    ----------
+    base_names : <list>
+        Names of the base features.
+    first : <numpy array>
+        Index of the first base feature of each expanded feature.
+    second : <numpy array>
+        Index of the second base feature of each expanded feature, -1 for
+        base features.
+    """
+    __slots__ = ["_base_names", "_first", "_second"]
+
+    def __init__(self, base_names, first, second):
+        self._base_names = [str(name) for name in base_names]
+        self._first = first
+        self._second = second
+
+    def __len__(self):
+        return len(self._first)
+
+    def __getitem__(self, ind):
+        if isinstance(ind, (int, np.integer)):
+            first = self._base_names[self._first[ind]]
+            if self._second[ind] < 0:
+                return first
+            elif self._second[ind] == self._first[ind]:
+                return first + '^2'
+            return first + '*' + self._base_names[self._second[ind]]
+        return [self[i] for i in np.arange(len(self))[ind]]
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    def __array__(self, dtype=None):
+        return np.array(list(self), dtype=object)
+
+
+class _PolynomialDesign:
+    """
+    Virtual design matrix holding the base features, their squares and their
+    pairwise interactions (2-polynoms). Only the base data and, for each
+    expanded feature, the index pair of base features it is the product of 
+    are stored. Columns are generated on demand in chunks. 
+    
+    The design itself does not hold the O(p^2) expanded columns, but every
+    block requested from it is dense. The elementary models need the full
+    train block of a split, so each split still materializes all active 
+    expanded columns for its train rows, and ``get(columns=None)`` builds 
+    the full expansion. Memory is only saved outside these blocks, e.g. 
+    across splits and for the test data.
+    
+    PARAMETERS
+    ----------
+    data : <numpy array>
+        Base data without polynomial features.
+    feat_names : <list>
+        Names of the base features.
+    interaction_only : <boolean>
+        If ``True``, squared features are omitted.
+    candidates : <list> or <numpy array>
+        Base features among which squares and interactions are built. 
+        Default: ``candidates=None``, i.e. all base features.
+    chunk_size : <int>
+        Number of expanded columns generated at once. Default: ``chunk_size=1024``.
+    dtype : <numpy dtype>
+        Floating point type of the base data and the generated columns.
+        Default: ``dtype=np.float64``.
+    """
+    __slots__ = ["_base", "_first", "_second", "_chunk_size", "shape",
+                 "feature_names"]
+
+    def __init__(self, data, feat_names, interaction_only=False, 
+                 candidates=None, chunk_size=1024, dtype=np.float64):
+        self._base = np.asarray(data, dtype=dtype)
+        self._chunk_size = chunk_size
+        p = self._base.shape[1]
+        if candidates is None:
+            candidates = np.arange(p)
+        candidates = np.asarray(candidates, dtype=np.intp)
+
+        # Same order as sklearn's PolynomialFeatures
+        first, second = np.triu_indices(len(candidates), 
+                                        k=1 if interaction_only else 0)
+        self._first = np.concatenate([np.arange(p), 
+                                      candidates[first]]).astype(np.intp)
+        self._second = np.concatenate([np.full(p, -1), 
+                                       candidates[second]]).astype(np.intp)
+
+        self.shape = (self._base.shape[0], len(self._first))
+        self.feature_names = _PolynomialNames(feat_names, self._first, 
+                                              self._second)
+
+    def _expand(self, base, columns):
+        """
+        Compute expanded columns from base data.
+        """
+        first = self._first[columns]
+        second = self._second[columns]
+        expanded = base[:, first]
+        is_product = second >= 0
+        expanded[:, is_product] *= base[:, second[is_product]]
+        return expanded
+
+    def get(self, rows=slice(None), columns=None, data=None):
+        """
+        Dense block of the expanded design.
+        
+        PARAMETERS
+        ----------
+        rows : <numpy array> or <slice>
+            Rows to return. Default: all rows.
+        columns : <list> or <numpy array>
+            Expanded columns to return. Default: ``columns=None``, i.e. all
+            columns.
+        data : <numpy array>
+            Base data to expand instead of the stored data, e.g. test data.
+            
+        RETURNS
+        -------
+        <numpy array>
+            Matrix of shape (number of rows, number of columns).
+        """
+        base = self._base if data is None else \
+            np.asarray(data, dtype=self._base.dtype)
+        base = base[rows]
+        if columns is None:
+            columns = np.arange(self.shape[1])
+        columns = np.asarray(columns, dtype=np.intp)
+
+        # Columns are generated chunk by chunk into one preallocated array
+        expanded = np.empty((base.shape[0], len(columns)), 
+                            dtype=self._base.dtype)
+        for start in range(0, len(columns), self._chunk_size):
+            stop = min(start + self._chunk_size, len(columns))
+            expanded[:, start:stop] = self._expand(base, columns[start:stop])
+        return expanded
+
+
+class _FeatureClusters:
+    """
+    Clusters of highly correlated features. Features are assigned greedily 
+    to the first earlier cluster leader whose absolute correlation with 
+    them exceeds ``threshold``, otherwise they start a new cluster. 
+    Candidate leaders are found with locality-sensitive hashing on signs of 
+    random projections, such that each feature is only compared to few 
+    leaders. Clustering is therefore approximate, but scales to a large 
+    number of features.
+    
+    PARAMETERS
+    ----------
+    data : <numpy array>
+        Data the clusters are computed on.
+    feat_names : <list>
+        Names of the features.
+    threshold : <float>
+        Absolute correlation above which features are merged.
+    mode : <str>
+        ``'representative'`` represents a cluster by its leader, ``'mean'`` 
+        by the mean of its standardized, sign-aligned members.
+    n_bits : <int>
+        Number of projection signs per hash table.
+    n_tables : <int>
+        Number of hash tables.
+    random_state : <None or int>
+        Seed of the random projections.
+    chunk_size : <int>
+        Number of features standardized and hashed at once.
+    """
+    __slots__ = ["_mode", "_center", "_scale", "labels", "leaders", "signs",
+                 "member_names", "feature_names"]
+
+    def __init__(self, data, feat_names, threshold, mode='representative',
+                 n_bits=12, n_tables=16, random_state=None, chunk_size=1024):
+        data = np.asarray(data, dtype=float)
+        n, p = data.shape
+        self._mode = mode
+        self._center = data.mean(axis=0)
+        self._scale = data.std(axis=0)
+        constant = self._scale == 0
+        self._scale[constant] = 1
+
+        # Columns of unit length, such that dot products are correlations.
+        # Hash bits are signs of random projections.
+        rng = np.random.RandomState(random_state)
+        projections = rng.standard_normal((n, n_bits * n_tables))
+        unit = np.empty((n, p))
+        keys = np.empty((p, n_tables), dtype=np.int64)
+        powers = 1 << np.arange(n_bits, dtype=np.int64)
+        for start in range(0, p, chunk_size):
+            stop = min(start + chunk_size, p)
+            unit[:, start:stop] = (data[:, start:stop] - 
+                                   self._center[start:stop]) / \
+                (self._scale[start:stop] * np.sqrt(n))
+            signs = (unit[:, start:stop].T @ projections) > 0
+            keys[start:stop] = signs.reshape(stop - start, n_tables, 
+                                             n_bits) @ powers
+        # Keys of the negated features, to find negative correlations
+        flipped = ~keys & (powers[-1] * 2 - 1)
+
+        self.labels = np.empty(p, dtype=np.intp)
+        self.signs = np.ones(p)
+        leaders = []
+        buckets = [{} for _ in range(n_tables)]
+        for j in range(p):
+            candidates = set()
+            if not constant[j]:
+                for table in range(n_tables):
+                    candidates.update(buckets[table].get(keys[j, table], ()))
+                    candidates.update(buckets[table].get(flipped[j, table], 
+                                                         ()))
+            if len(candidates) > 0:
+                candidates = np.fromiter(candidates, dtype=np.intp)
+                correlations = unit[:, j] @ \
+                    unit[:, np.asarray(leaders)[candidates]]
+                best = np.argmax(np.abs(correlations))
+                if np.abs(correlations[best]) >= threshold:
+                    self.labels[j] = candidates[best]
+                    self.signs[j] = np.sign(correlations[best])
+                    continue
+            # New cluster
+            self.labels[j] = len(leaders)
+            if not constant[j]:
+                for table, key in enumerate(keys[j]):
+                    buckets[table].setdefault(key, []).append(len(leaders))
+            leaders.append(j)
+
+        self.leaders = np.asarray(leaders, dtype=np.intp)
+        self.member_names = list(feat_names)
+        self.feature_names = [feat_names[j] for j in self.leaders]
+
+    def transform(self, data, columns=None):
+        """
+        Cluster representatives or cluster means of data.
+        
+        PARAMETERS
+        ----------
+        data : <numpy array> or <pandas dataframe>
+            Data with the original features, e.g. test data.
+        columns : <list> or <numpy array>
+            Clusters to return. Default: ``columns=None``, i.e. all clusters.
+            
+        RETURNS
+        -------
+        <numpy array>
+            Matrix of shape (number of rows, number of columns).
+        """
+        data = np.asarray(data, dtype=float)
+        if columns is None:
+            columns = np.arange(len(self.leaders))
+        columns = np.asarray(columns, dtype=np.intp)
+        if self._mode == 'representative':
+            return data[:, self.leaders[columns]]
+
+        # Members of the requested clusters and their position among them
+        position = np.full(len(self.leaders), -1)
+        position[columns] = np.arange(len(columns))
+        members = np.where(position[self.labels] >= 0)[0]
+        target = position[self.labels[members]]
+        standardized = (data[:, members] - self._center[members]) / \
+            self._scale[members] * self.signs[members]
+        sums = np.zeros((data.shape[0], len(columns)))
+        np.add.at(sums.T, target, standardized.T)
+        return sums / np.bincount(target, minlength=len(columns))
+
+
+class _EnetLogistic:
+    """
+    Elastic net logistic regression fitted by coordinate descent, used for
+    ``classifier='enet_cd'``. The objective is the one of 
+    ``LogisticRegression(penalty='elasticnet')``, i.e. ``C`` times the 
+    summed log loss plus ``l1_ratio * ||w||_1 + (1 - l1_ratio) / 2 * 
+    ||w||_2^2``, with an unpenalized intercept.
+    
+    Outer iterations replace the log loss by its quadratic approximation 
+    at the current solution (IRLS). The resulting weighted elastic net is 
+    solved by the coordinate descent of ``enet_path``, but only on the 
+    working set of features. Without l1 penalty, it is solved directly. 
+    
+    The penalty decreases along a short path, starting where the first 
+    feature enters the model. In each step, the working set consists of 
+    the nonzero coefficients and the features kept by the sequential 
+    strong rule. Features outside the working set that violate the 
+    optimality conditions are added until none is left. The final 
+    solution is therefore exact within ``tol``, while most features are 
+    only touched by one gradient computation per step.
+    
+    PARAMETERS
+    ----------
+    C : <float>
+        Inverse regularization strength.
+    l1_ratio : <float>
+        Elastic net mixing parameter.
+    max_iter : <int>
+        Maximum number of coordinate descent epochs of each inner solve.
+    tol : <float>
+        Tolerance of the inner solves and of the IRLS iterations.
+    n_lambdas : <int>
+        Number of penalties on the path.
+    max_irls : <int>
+        Maximum number of IRLS iterations per penalty.
+    warm_start : <bool>
+        Start from ``coef_`` and ``intercept_`` at the final penalty.
+    """
+    __slots__ = ["C", "l1_ratio", "max_iter", "tol", "n_lambdas", "max_irls",
+                 "warm_start", "coef_", "intercept_", "classes_", "n_iter_",
+                 "converged_"]
+
+    def __init__(self, C=1.0, l1_ratio=0.5, max_iter=5000, tol=1e-4, 
+                 n_lambdas=10, max_irls=50, warm_start=False):
+        self.C = C
+        self.l1_ratio = l1_ratio
+        self.max_iter = max_iter
+        self.tol = tol
+        self.n_lambdas = n_lambdas
+        self.max_irls = max_irls
+        self.warm_start = warm_start
+
+    def fit(self, X, y):
+        """
+        Fit the model.
+        
+        PARAMETERS
+        ----------
+        X : <numpy array> or <scipy sparse matrix>
+            Train data.
+        y : <numpy array>
+            Binary target.
+            
+        RETURNS
+        -------
+        <_EnetLogistic>
+            The fitted model.
+        """
+        y = np.asarray(y)
+        self.classes_ = np.unique(y)
+        target = (y == self.classes_[1]).astype(float)
+        n, p = X.shape
+        # Penalty of the objective divided by C * n
+        lam = 1 / (self.C * n)
+        alpha = self.l1_ratio
+
+        if self.warm_start and hasattr(self, 'coef_'):
+            w = np.array(self.coef_, dtype=float).ravel()
+            b = float(np.ravel(self.intercept_)[0])
+            lambdas = [lam]
+        else:
+            mean = np.clip(target.mean(), 1e-10, 1 - 1e-10)
+            w = np.zeros(p)
+            b = np.log(mean / (1 - mean))
+            gradient = np.asarray(X.T @ (target - mean)).ravel() / n
+            # Smallest penalty without selected features
+            lam_max = np.max(np.abs(gradient)) / max(alpha, 1e-3)
+            if alpha > 0 and lam_max > lam:
+                lambdas = np.geomspace(lam_max, lam, self.n_lambdas + 1)[1:]
+            else:
+                lambdas = [lam]
+
+        self.n_iter_ = 0
+        self.converged_ = True
+        lam_prev = lambdas[0] if len(lambdas) == 1 else \
+            lambdas[0] * lambdas[0] / lambdas[1]
+        for lam_k in lambdas:
+            prob = expit(b + X @ w)
+            gradient = np.asarray(X.T @ (target - prob)).ravel() / n
+            # Sequential strong rule
+            working = (np.abs(gradient) >= alpha * (2 * lam_k - lam_prev)) | \
+                (w != 0)
+            while True:
+                columns = np.where(working)[0]
+                w[~working] = 0
+                w[columns], b = self._irls(X, target, columns, w[columns], b,
+                                           lam_k)
+                prob = expit(b + X @ w)
+                gradient = np.asarray(X.T @ (target - prob)).ravel() / n
+                # Optimality conditions of the coefficients fixed at zero
+                violations = ~working & (np.abs(gradient) > lam_k * alpha)
+                if not np.any(violations):
+                    break
+                working |= violations
+            lam_prev = lam_k
+
+        self.coef_ = w[np.newaxis, :]
+        self.intercept_ = np.array([b])
+        self.n_iter_ = np.array([self.n_iter_])
+        return self
+
+    def _irls(self, X, target, columns, w, b, lam):
+        """
+        IRLS iterations on the given columns. Each step solves the weighted
+        elastic net of the quadratic approximation and is halved while the 
+        objective increases. If it still increases at a step of 1e-3, the 
+        current solution is kept and the fit counts as not converged, as it
+        does if an inner solve stops at ``max_iter``.
+        
+        RETURNS
+        -------
+        <tuple>
+            Coefficients of the columns and intercept.
+        """
+        n = len(target)
+        X_work = X[:, columns]
+        if sparse.issparse(X_work):
+            X_work = X_work.toarray()
+        X_work = np.asarray(X_work, dtype=float)
+        alpha = self.l1_ratio
+
+        def objective(w, b):
+            eta = b + X_work @ w
+            loss = np.mean(np.logaddexp(0, eta) - target * eta)
+            return loss + lam * (alpha * np.sum(np.abs(w)) + 
+                                 (1 - alpha) / 2 * np.sum(w ** 2))
+
+        current = objective(w, b)
+        for _ in range(self.max_irls):
+            self.n_iter_ += 1
+            eta = b + X_work @ w
+            prob = expit(eta)
+            weights = np.clip(prob * (1 - prob), 1e-5, None)
+            z = eta + (target - prob) / weights
+
+            # The intercept is removed by weighted centering
+            x_mean = weights @ X_work / weights.sum()
+            z_mean = weights @ z / weights.sum()
+            if len(columns) > 0 and alpha == 0:
+                # Ridge: closed form, in the dual if there are more 
+                # features than objects
+                root = np.sqrt(weights)
+                X_w = (X_work - x_mean) * root[:, np.newaxis]
+                z_w = (z - z_mean) * root
+                if X_w.shape[1] > n:
+                    w_new = X_w.T @ np.linalg.solve(
+                        X_w @ X_w.T + n * lam * np.eye(n), z_w)
+                else:
+                    w_new = np.linalg.solve(
+                        X_w.T @ X_w + n * lam * np.eye(X_w.shape[1]), 
+                        X_w.T @ z_w)
+            elif len(columns) > 0:
+                root = np.sqrt(weights)
+                _, coefs, _, n_iters = enet_path(
+                    np.asfortranarray((X_work - x_mean) * root[:, np.newaxis]),
+                    (z - z_mean) * root, l1_ratio=alpha, alphas=[lam], 
+                    coef_init=w.copy(), max_iter=self.max_iter, 
+                    tol=self.tol, return_n_iter=True)
+                w_new = coefs[:, 0]
+                # An inner solve stopped at max_iter
+                if n_iters[0] >= self.max_iter:
+                    self.converged_ = False
+            else:
+                w_new = w
+            b_new = z_mean - x_mean @ w_new
+
+            step = 1.0
+            new = objective(w_new, b_new)
+            while new > current and step > 1e-3:
+                step /= 2
+                w_step = w + step * (w_new - w)
+                b_step = b + step * (b_new - b)
+                new = objective(w_step, b_step)
+            change = max(np.max(np.abs(w_new - w), initial=0), abs(b_new - b))
+            if new > current:
+                # No decrease along the step. Steps below tol only differ 
+                # from the current solution by rounding
+                if change >= self.tol:
+                    self.converged_ = False
+                break
+            if step < 1:
+                w_new, b_new = w_step, b_step
+                change *= step
+
+            w, b, current = w_new, b_new, new
+            if change < self.tol:
+                break
+        else:
+            self.converged_ = False
+        return w, b
+
+    def decision_function(self, X):
+        """
+        Linear predictor of the objects in ``X``.
+        """
+        return np.asarray(X @ self.coef_.ravel()).ravel() + self.intercept_[0]
+
+    def predict_proba(self, X):
+        """
+        Probabilities of both classes for the objects in ``X``.
+        """
+        prob = expit(self.decision_function(X))
+        return np.column_stack([1 - prob, prob])
+
+    def predict(self, X):
+        """
+        Predicted classes of the objects in ``X``.
+        """
+        return self.classes_[(self.decision_function(X) > 0).astype(int)]
+
+    def score(self, X, y):
+        """
+        Accuracy on ``X`` and ``y``.
+        """
+        return accuracy_score(y, self.predict(X))
+
+
+class _PhaseTimer:
+    """
+    Accumulated wall and CPU time per phase and worker thread. A phase is 
+    measured between ``tic()`` and ``toc()``. The CPU time is the one of 
+    the calling thread, hence it excludes threads started by numerical 
+    libraries. Each worker thread only updates its own entries, such that
+    only the numbering of new workers needs a lock.
+    
+    Workers are numbered in the order in which they first measure a phase
+    within a run, see ``new_run()``. A new pool of threads in a later run 
+    thus adds to the entries of the previous pool.
+    """
+    __slots__ = ["totals", "workers", "_lock"]
+
+    def __init__(self):
+        # (phase, worker) -> [wall time, CPU time, number of calls]
+        self.totals = {}
+        # Thread name -> worker of the current run
+        self.workers = {}
+        self._lock = threading.Lock()
+
+    def new_run(self):
+        """
+        Number the worker threads anew, e.g. for a new pool of threads.
+        """
+        with self._lock:
+            self.workers = {}
+
+    def _worker(self):
+        """
+        Worker of the calling thread: ``'main'`` or ``'worker <i>'``.
+        """
+        thread = threading.current_thread()
+        if thread is threading.main_thread():
+            return 'main'
+        worker = self.workers.get(thread.name)
+        if worker is None:
+            with self._lock:
+                worker = self.workers.setdefault(
+                    thread.name, 'worker ' + str(len(self.workers)))
+        return worker
+
+    def tic(self):
+        """
+        Start of a measurement.
+        """
+        return time.perf_counter(), time.thread_time()
+
+    def toc(self, phase, tic):
+        """
+        Add the time since ``tic`` to ``phase``.
+        
+        RETURNS
+        -------
+        <tuple>
+            New start, such that consecutive phases can be chained.
+        """
+        now = time.perf_counter(), time.thread_time()
+        key = (phase, self._worker())
+        totals = self.totals.setdefault(key, [0.0, 0.0, 0])
+        totals[0] += now[0] - tic[0]
+        totals[1] += now[1] - tic[1]
+        totals[2] += 1
+        return now
+
+    def to_frame(self, per_worker=False):
+        """
+        Accumulated times as dataframe with columns ``wall``, ``cpu`` and 
+        ``calls`` and index phase (and worker).
+        """
+        frame = pd.DataFrame(
+            [[phase, worker] + list(totals) 
+             for (phase, worker), totals in list(self.totals.items())],
+            columns=['phase', 'worker', 'wall', 'cpu', 'calls'])
+        if per_worker:
+            return frame.set_index(['phase', 'worker']).sort_index()
+        return frame.groupby('phase')[['wall', 'cpu', 'calls']].sum()
+
+
+def _timed(phase):
+    """
+    Decorator that adds the time of a method call to ``phase``.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            tic = self._timer.tic()
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                self._timer.toc(phase, tic)
+        return wrapper
+    return decorator
 
 
 class RENT_Base(ABC):
@@ -39,9 +648,15 @@ class RENT_Base(ABC):
     
     PARAMETERS
     -----
-    data: <numpy array> or <pandas dataframe>
+    data: <numpy array>, <pandas dataframe>, <scipy sparse matrix> or <str>
         Dataset on which feature selection shall be performed. 
-        Variable types must be numeric or integer.
+        Variable types must be numeric or integer. Sparse data is kept 
+        sparse and scaled without centering. Regression models then fit an 
+        intercept, which centers the data implicitly. Polynomial features and 
+        feature clusters convert sparse data to a dense array.
+        A path to a ``.npy`` file is opened as a memory map. Memory maps 
+        (``np.memmap``) are not loaded into memory, only the blocks of 
+        each split are read from disk.
     target: <numpy array> or <pandas dataframe>
         Response variable of data.
     feat_names : <list>
@@ -58,6 +673,7 @@ class RENT_Base(ABC):
         Cross-validated elastic net hyperparameter selection.
             - ``autoEnetParSel=True`` : peform a cross-validation pre-hyperparameter\
                 search, such that RENT runs only with one hyperparamter setting.
+                The search runs in ``fit_hyperparameters()`` or ``train()``.
             - ``autoEnetParSel=False`` : perform RENT with each combination of ``C`` \
                 and ``l1_ratios``. Default: ``autoEnetParSel=True``.
     BIC : <boolean>
@@ -70,6 +686,14 @@ class RENT_Base(ABC):
             - ``poly='ON'`` : feature interaction and squared features (2-polynoms).
             - ``poly='ON_only_interactions'`` : only feature interactions, \
                 no squared features.
+            - ``poly='hierarchical'`` : two-stage screening. RENT is first \
+                trained on the base features. Squares and interactions are \
+                only built among features that pass ``poly_tau_cutoffs`` \
+                and RENT is trained again on the base features plus these \
+                candidates.
+        Expanded features are generated on demand, but the train block of 
+        each split holds all active expanded features densely, i.e. 
+        O(n*p^2) memory per split and parallel worker.
     testsize_range : <tuple float>
          Inside RENT, ``K`` models are trained, where the testsize defines the 
          proportion of train data used for testing of a single model. The testsize 
@@ -87,17 +711,175 @@ class RENT_Base(ABC):
     verbose : <int>
         Track the train process if value > 1. If ``verbose = 1``, only the overview
         of RENT input will be shown. Default: ``verbose=0``.
+    poly_tau_cutoffs : <tuple float>
+        Cutoffs for tau_1, tau_2 and tau_3 in the first stage of 
+        ``poly='hierarchical'``. Should be looser than the cutoffs used in
+        ``select_features()``. If ``autoEnetParSel=True``, the second stage 
+        selects its own hyperparameters on the full grid of ``C`` and 
+        ``l1_ratios`` for the expanded design. 
+        Default: ``poly_tau_cutoffs=(0.5, 0.5, 0.5)``.
+    screening : <None or str>
+        Univariate screening of features before the ensemble. Features are 
+        ranked by a marginal statistic and only the top ``screening_size`` 
+        features are used to train the models. Default: ``screening=None``.
+            - ``screening=None`` : no screening.
+            - ``screening='correlation'`` : absolute Pearson correlation \
+                with the target.
+            - ``screening='t'`` : absolute t-statistic.
+            - ``screening='logistic'`` : score statistic of a univariate \
+                logistic regression (classification only).
+    screening_size : <None or int>
+        Number of features kept by the screening. 
+        Default: ``screening_size=None``, i.e. n / log(n) features.
+    screening_per_split : <boolean>
+        If ``True``, features are screened on the train data of each of the 
+        ``K`` models and of each cross-validation fold of the hyperparameter
+        search instead of once on all data, which avoids selection bias in 
+        the test scores. Selection criteria always refer to the original 
+        features. Default: ``screening_per_split=False``.
+    coarse_pass : <None, True or dict>
+        Coarse-to-fine training. A fast ensemble with fewer models, a looser 
+        solver tolerance and fewer iterations is trained first. Only features
+        whose tau_1 exceeds a low cutoff in any hyperparameter combination 
+        enter the hyperparameter search and the full ensemble. If 
+        ``screening_per_split=True``, each split then only screens these 
+        features. Default: ``coarse_pass=None``.
+            - ``coarse_pass=None`` : no coarse pass.
+            - ``coarse_pass=True`` : coarse pass with default settings \
+                ``{'K': 20, 'tol': 1e-2, 'max_iter': 200, 'tau_1_cutoff': 0}``.
+            - ``coarse_pass=<dict>`` : coarse pass, where the given keys \
+                replace the default settings.
+    subspace : <None, float or int>
+        Random-subspace mode. In addition to the train/test split of the 
+        objects, each model draws a random subset of the features and is 
+        only fitted on these. tau_1, tau_2 and tau_3 of a feature are then 
+        computed over the models the feature was eligible for instead of 
+        over all ``K`` models. Default: ``subspace=None``.
+            - ``subspace=None`` : each model uses all features.
+            - ``subspace=<float>`` : fraction of the features in (0, 1].
+            - ``subspace=<int>`` : number of features.
+    train_size : <None or int>
+        Maximum number of train objects of each model. If the train set of 
+        a split is larger, a random subset of this size is used (stratified 
+        for classification), such that the cost of a model does not grow 
+        with the number of objects. The cap also applies to the folds of 
+        the hyperparameter search, the BIC models and the pilot models of 
+        ``warm_start``. Default: ``train_size=None``.
+    test_size : <None or int>
+        Maximum number of test objects of each model, analogous to 
+        ``train_size``. Per-object summaries refer to the objects that were 
+        drawn as test objects. Default: ``test_size=None``.
+    cluster_threshold : <None or float>
+        If set, features whose absolute correlation exceeds this value are 
+        merged into clusters before the ensemble, using a fast approximate 
+        method. The ensemble runs on one column per cluster, named after 
+        the first feature of the cluster, and selection criteria refer to 
+        the clusters. Test data in the validation study keeps the original 
+        features. Default: ``cluster_threshold=None``.
+    cluster_mode : <str>
+        Column of a cluster in the ensemble. 
+        Default: ``cluster_mode='representative'``.
+            - ``cluster_mode='representative'`` : first feature of the \
+                cluster.
+            - ``cluster_mode='mean'`` : mean of the standardized, \
+                sign-aligned features of the cluster.
+    dtype : <numpy dtype>
+        Floating point type of the data, the scaled splits, the stored 
+        weights, object probabilities and absolute errors. ``saga`` and the
+        coordinate descent of ``ElasticNet`` and ``engine='path'`` fit 
+        ``np.float32`` data without upcasting, which halves memory and 
+        memory bandwidth. ``classifier='enet_cd'`` and the ``'lbfgs'`` and 
+        ``'liblinear'`` solvers of ``solver_policy`` compute in float64 
+        internally, only their stored weights are ``np.float32``. Weights 
+        are then only accurate to about 7 significant digits. tau_1 and tau_2 only depend on zeros and signs 
+        and are hardly affected. tau_3 is accumulated in float64, but may 
+        differ slightly for features whose mean weight is close to 0 relative 
+        to its standard deviation. Default: ``dtype=np.float64``.
+    data_order : <None or str>
+        Memory layout of the stored data. Dense data is stored as one numpy 
+        array, object and feature names are kept separately. Arrays and 
+        dataframes that already have the requested ``dtype`` and a 
+        contiguous layout are not copied. Memory maps keep their layout.
+        Default: ``data_order=None``.
+            - ``data_order=None`` : keep the layout of the input, \
+                non-contiguous input is copied to C order.
+            - ``data_order='C'`` : row-major layout.
+            - ``data_order='F'`` : column-major layout, which suits the \
+                column-wise updates of coordinate descent.
+    successive_halving : <None, True or dict>
+        Successive halving over the combinations of ``C`` and ``l1_ratios`` 
+        if ``autoEnetParSel=False``. All combinations are trained with 
+        ``min_K`` models first. After each round, only the best 
+        ``1 / factor`` of the combinations w.r.t. the harmonic mean of 
+        scores and zeros are kept, and their number of models is multiplied 
+        by ``factor`` until ``K`` is reached. The best combination is 
+        selected among the combinations trained with ``K`` models. 
+        Default: ``successive_halving=None``.
+            - ``successive_halving=None`` : all combinations get ``K`` models.
+            - ``successive_halving=True`` : default settings \
+                ``{'min_K': 10, 'factor': 2}``.
+            - ``successive_halving=<dict>`` : the given keys replace the \
+                default settings.
+    model_based_search : <None, True or dict>
+        If ``autoEnetParSel=True`` and ``BIC=False``, search ``C`` and 
+        ``l1_ratio`` continuously instead of only on the grid. ``C`` is 
+        searched on a log scale between ``min(C)`` and ``max(C)``, 
+        ``l1_ratio`` between ``min(l1_ratios)`` and ``max(l1_ratios)``. 
+        A Gaussian process models the same harmonic mean of cross-validated 
+        score and zeros that the grid search maximizes. Batches of 
+        ``batch_size`` combinations with the highest expected improvement 
+        are evaluated in parallel until ``n_evaluations`` combinations 
+        were evaluated. Default: ``model_based_search=None``.
+            - ``model_based_search=None`` : grid search.
+            - ``model_based_search=True`` : default settings \
+                ``{'n_evaluations': 30, 'n_initial': 8, 'batch_size': None}``,
+                where ``batch_size=None`` uses the number of cores.
+            - ``model_based_search=<dict>`` : the given keys replace the \
+                default settings.
+    warm_start : <bool>
+        If ``True``, a pilot model is fitted on all objects for each 
+        hyperparameter combination, and the ``K`` models of the combination
+        start from its coefficients instead of zeros. Since the train sets 
+        overlap heavily, the coordinate descent of ``RENT_Regression`` 
+        needs fewer iterations. ``saga`` restarts its gradient memory in 
+        each fit and gains little. The pilot fits do not depend on the 
+        order in which the models are trained. Default: ``warm_start=False``.
     """
     __slots__=["_data", "_target", "_feat_names", "_C", "_l1_ratios", "_autoEnetParSel",
                "_BIC", "_poly", "_testsize_range", "_K", "_scale", "_random_state",
                "_verbose", "_summary_df", "_score_dict", "_BIC_df", "_best_C",
                "_best_l1_ratio", "_indices", "_runtime", "_scores_df", "_combination", 
-               "_zeros", "_perc", "_self_var", "_X_test", "_zeros_df","_sel_var",
-               "_incorrect_labels", "_pp_data"]
+               "_zeros", "_perc", "_self_var", "_zeros_df","_sel_var",
+               "_incorrect_labels", "_pp_data", "_test_data_cache",
+               "_poly_tau_cutoffs", "_interaction_candidates", "_screening",
+               "_screening_size", "_screening_per_split", "_active_features",
+               "_coarse_pass", "_max_iter", "_tol", "_subspace",
+               "_eligible_dict", "_train_size", "_test_size", "_clusters",
+               "_dtype", "_data_order", "_hyperparameters_fitted", 
+               "_executor", "_successive_halving", "_cells", "_n_models",
+               "_model_based_search", "_search_history", "_warm_start",
+               "_pilot_coef", "_fit_diagnostics", "_timer",
+               "_hyperparameter_grid", "_screening_candidates"]
+
+    # Number of columns processed at once when iterating over features
+    _chunk_size = 1024
+
+    # Number of rows processed at once when accumulating scaling statistics
+    _row_chunk_size = 4096
+
+    # Solver tolerance of the models, loosened by the coarse pass
+    _default_tol = 1e-4
 
     def __init__(self, data, target, feat_names=[], C=[1,10], l1_ratios = [0.6],
                  autoEnetParSel=True, BIC=False, poly='OFF',testsize_range=(0.2, 0.6), 
-                 K=100, scale = True, random_state = None, verbose = 0):
+                 K=100, scale = True, random_state = None, verbose = 0,
+                 poly_tau_cutoffs=(0.5, 0.5, 0.5), screening=None,
+                 screening_size=None, screening_per_split=False,
+                 coarse_pass=None, subspace=None, train_size=None,
+                 test_size=None, cluster_threshold=None,
+                 cluster_mode='representative', dtype=np.float64,
+                 data_order=None, successive_halving=None, 
+                 model_based_search=None, warm_start=False):
 
         if any(c < 0 for c in C):
             sys.exit('C values must not be negative!')
@@ -105,12 +887,57 @@ class RENT_Base(ABC):
             sys.exit('l1 ratios must be in [0,1]!')
         if autoEnetParSel not in [True, False]:
             sys.exit('autoEnetParSel must be True or False!')
+        if warm_start not in [True, False]:
+            sys.exit('warm_start must be True or False!')
         if BIC not in [True, False]:
             sys.exit('BIC must be True or False!')
         if scale not in [True, False]:
             sys.exit('scale must be True or False!')
-        if poly not in ['ON', 'ON_only_interactions', 'OFF']:
+        if poly not in ['ON', 'ON_only_interactions', 'hierarchical', 'OFF']:
             sys.exit('Invalid poly parameter!')
+        if screening not in [None, 'correlation', 't', 'logistic']:
+            sys.exit('Invalid screening parameter!')
+        if screening_per_split not in [True, False]:
+            sys.exit('screening_per_split must be True or False!')
+        if coarse_pass is True:
+            coarse_pass = {}
+        if coarse_pass is not None and not isinstance(coarse_pass, dict):
+            sys.exit('coarse_pass must be None, True or a dict!')
+        if subspace is not None and (subspace <= 0 or 
+                                     (isinstance(subspace, float) and 
+                                      subspace > 1)):
+            sys.exit('subspace must be None, a float in (0,1] or a positive int!')
+        if (train_size is not None and train_size <= 0) or \
+            (test_size is not None and test_size <= 0):
+            sys.exit('train_size and test_size must be None or positive!')
+        if cluster_threshold is not None and not 0 < cluster_threshold <= 1:
+            sys.exit('cluster_threshold must be None or in (0,1]!')
+        if cluster_mode not in ['representative', 'mean']:
+            sys.exit('Invalid cluster_mode parameter!')
+        if np.dtype(dtype) not in [np.float32, np.float64]:
+            sys.exit('dtype must be np.float32 or np.float64!')
+        if data_order not in [None, 'C', 'F']:
+            sys.exit("data_order must be None, 'C' or 'F'!")
+        if successive_halving is True:
+            successive_halving = {}
+        if successive_halving is not None:
+            if not isinstance(successive_halving, dict):
+                sys.exit('successive_halving must be None, True or a dict!')
+            successive_halving = dict({'min_K': 10, 'factor': 2}, 
+                                      **successive_halving)
+            if successive_halving['min_K'] <= 0 or \
+                    successive_halving['factor'] < 2:
+                sys.exit('successive_halving needs min_K > 0 and factor >= 2!')
+        if model_based_search is True:
+            model_based_search = {}
+        if model_based_search is not None:
+            if not isinstance(model_based_search, dict):
+                sys.exit('model_based_search must be None, True or a dict!')
+            model_based_search = dict({'n_evaluations': 30, 'n_initial': 8,
+                                       'batch_size': None}, 
+                                      **model_based_search)
+            if any(c <= 0 for c in C):
+                sys.exit('model_based_search needs positive C values!')
         if K<=0:
             sys.exit('Invalid K!')
         if K<10:
@@ -134,7 +961,7 @@ class RENT_Base(ABC):
         # Define all objects needed later in methods below
         self._target = target
         self._K = K
-        self._feat_names = feat_names
+        self._feat_names = list(feat_names)
         self._testsize_range = testsize_range
         self._scale = scale
         self._verbose = verbose
@@ -142,90 +969,143 @@ class RENT_Base(ABC):
         self._BIC = BIC
         self._random_state = random_state
         self._poly = poly
-
+        self._poly_tau_cutoffs = poly_tau_cutoffs
+        self._screening = screening
+        self._screening_size = screening_size
+        self._screening_per_split = screening_per_split
+        if coarse_pass is not None:
+            coarse_pass = dict({'K': 20, 'tol': 1e-2, 'max_iter': 200, 
+                                'tau_1_cutoff': 0}, **coarse_pass)
+        self._coarse_pass = coarse_pass
+        self._subspace = subspace
+        self._train_size = train_size
+        self._test_size = test_size
+        self._dtype = np.dtype(dtype)
+        self._data_order = data_order
+        self._successive_halving = successive_halving
+        self._model_based_search = model_based_search
+        self._warm_start = warm_start
+        # Coefficients of the pilot models per (C, l1), see warm_start
+        self._pilot_coef = {}
+        # Solver settings of the elementary models
+        self._max_iter = 5000
+        self._tol = self._default_tol
+        self._test_data_cache = None
+        # Time per phase, see get_phase_times()
+        self._timer = _PhaseTimer()
+        tic = self._timer.tic()
+
+        if isinstance(data, (str, os.PathLike)):
+            data = np.load(data, mmap_mode='r')
+
+        if sparse.issparse(data) and (poly != 'OFF' or 
+                                      cluster_threshold is not None):
+            warnings.warn('Polynomial features and feature clusters need '
+                          'dense data - sparse data is converted.')
+            data = data.toarray()
+
+        # Object names are kept separately from the data. Neither the data
+        # nor the target of the caller are modified.
         if isinstance(data, pd.DataFrame):
-            if not isinstance(data.index, list):
-                data.index = list(data.index)
-            self._indices = data.index
+            self._indices = pd.Index(list(data.index))
+            data = data.to_numpy(dtype=self._dtype, copy=False)
         else:
-            self._indices = list(range(data.shape[0]))
+            self._indices = pd.Index(list(range(data.shape[0])))
 
         if isinstance(self._target, pd.Series):
-            self._target.index = self._indices
+            self._target = self._target.set_axis(self._indices)
 
         # If no feature names are given, create some
         if len(self._feat_names) == 0:
             print('No feature names found - automatic generate feature names.')
 
-            for ind in range(1, np.shape(data)[1] + 1):
-                self._feat_names.append('f' + str(ind))
-
-        # Extend data if poly was set to 'ON' or 'ON_only_interactions'
+            self._feat_names = ['f' + str(ind) 
+                                for ind in range(1, np.shape(data)[1] + 1)]
+
+        # Collapse clusters of highly correlated features
+        self._clusters = None
+        if cluster_threshold is not None:
+            self._clusters = _FeatureClusters(data, self._feat_names,
+                                              cluster_threshold, cluster_mode,
+                                              random_state=random_state)
+            data = self._clusters.transform(data)
+            self._feat_names = self._clusters.feature_names
+            if verbose == 1:
+                print('number of feature clusters:', len(self._feat_names))
+
+        # Extend data if poly was set to 'ON' or 'ON_only_interactions'.
+        # Squares and interactions are not materialized, but generated
+        # on demand from the base features.
         if self._poly == 'ON':
-            self._polynom = PolynomialFeatures(interaction_only=False, \
-                                         include_bias=False)
-            self._data = self._polynom.fit_transform(data)
-            polynom_comb = list(combinations_with_replacement(self._feat_names,\
-                                                              2))
-            polynom_feat_names = []
-            # Construct a new name for squares and interactions
-            for item in polynom_comb:
-                name = item[0] + '^2' if item[0] == item[1] else item[0] + '*' + item[1]
-                polynom_feat_names.append(name)
-
-            flist = list(self._feat_names)
-            flist.extend(polynom_feat_names)
-            self._feat_names = flist
-            self._data = pd.DataFrame(self._data)
-            self._data.index = self._indices
-            self._data.columns = self._feat_names
+            self._data = _PolynomialDesign(data, self._feat_names,
+                                           interaction_only=False,
+                                           dtype=self._dtype)
+            self._feat_names = self._data.feature_names
 
         elif self._poly == 'ON_only_interactions':
-            self._polynom = PolynomialFeatures(interaction_only=True,\
-                                         include_bias=False)
-            self._data = self._polynom.fit_transform(data)
-
-            polynom_comb = list(combinations(self._feat_names, 2))
-            polynom_feat_names = []
-
-            # Construct a new name for squares and interactions
-            for item in polynom_comb:
-                name = item[0] + '*' + item[1]
-                polynom_feat_names.append(name)
-
-            flist = list(self._feat_names)
-            flist.extend(polynom_feat_names)
-            self._feat_names = flist
-            self._data = pd.DataFrame(self._data)
-            self._data.index = self._indices
-            self._data.columns = self._feat_names
-
-        elif self._poly == 'OFF':
-            self._data = pd.DataFrame(data)
-            self._data.index=self._indices
-            self._data.columns = self._feat_names
+            self._data = _PolynomialDesign(data, self._feat_names,
+                                           interaction_only=True,
+                                           dtype=self._dtype)
+            self._feat_names = self._data.feature_names
 
-        else:
-            sys.exit('Value for paramter "poly" not regcognised.')
+        elif sparse.issparse(data):
+            # Columns are sliced most often, hence CSC
+            self._data = sparse.csc_matrix(data, dtype=self._dtype)
 
+        elif isinstance(data, np.memmap):
+            # Stays on disk, blocks are read in _get_data()
+            self._data = data
+
+        elif self._poly in ['OFF', 'hierarchical']:
+            # For 'hierarchical', candidates are added in train()
+            self._data = self._as_array(data)
 
-        if self._autoEnetParSel == True:
-            if self._BIC == False:
-                self._C, self._l1_ratios = self._par_selection(C=C, 
-                                                            l1_ratios=l1_ratios)
-            else:
-                self._C, self._l1_ratios = self._par_selection_BIC(C=C, 
-                                                            l1_ratios=l1_ratios)
-            self._C = [self._C]
-            self._l1_ratios = [self._l1_ratios]
         else:
-            self._C = C
-            self._l1_ratios = l1_ratios
+            sys.exit('Value for paramter "poly" not regcognised.')
+
+        # Features the hyperparameter search and the ensemble are trained on
+        self._active_features = self._screen_features()
+        # Features screened per split if screening_per_split=True, None for 
+        # all features
+        self._screening_candidates = None
+
+        # If autoEnetParSel=True, C and l1_ratios are reduced to the best 
+        # combination in fit_hyperparameters()
+        self._C = C
+        self._l1_ratios = l1_ratios
+        self._hyperparameter_grid = (C, l1_ratios)
+        self._hyperparameters_fitted = False
+        self._executor = None
+        self._timer.toc('setup', tic)
     
     @abstractmethod
     def run_parallel(self, K):
         pass
 
+    @abstractmethod
+    def _init_ensemble_results(self):
+        pass
+
+    @abstractmethod
+    def _marginal_statistic(self, X, y):
+        pass
+
+    @abstractmethod
+    def _elementary_model(self, C, l1, columns=None):
+        pass
+
+    @abstractmethod
+    def _cv_splitter(self, n_splits=5):
+        pass
+
+    @abstractmethod
+    def _strata(self):
+        pass
+
+    @abstractmethod
+    def _cv_evaluate(self, C, l1, cv):
+        pass
+
     @abstractmethod
     def _par_selection(self, C_params, l1_params, n_splits, testsize_range):
         pass
@@ -253,87 +1133,500 @@ class RENT_Base(ABC):
         For each model elastic net regularisation is applied for feature selection. 
         Internally, ``train()`` calls the ``run_parallel()`` function for classification 
         or regression, respectively.
+        
+        If ``poly='hierarchical'``, the ensemble is first trained on the base
+        features. Squares and interactions among the features passing 
+        ``poly_tau_cutoffs`` are then added and the ensemble is trained again.
+        If ``autoEnetParSel=True``, the hyperparameters are selected again 
+        for the second stage.
+        
+        If ``coarse_pass`` is set, a fast ensemble first removes features 
+        that (almost) never get a weight unequal to 0. The coarse ensemble 
+        is trained for all combinations of ``C`` and ``l1_ratios``.
+        
+        If ``autoEnetParSel=True`` and ``fit_hyperparameters()`` was not 
+        called before, the hyperparameters are then selected on the 
+        remaining features. The order is hence: first stage of 
+        ``poly='hierarchical'``, coarse pass, hyperparameter search, 
+        ensemble. The search and all ensemble fits share one pool of 
+        workers.
+        """
+        self._timer.new_run()
+        with Parallel(n_jobs=-1, verbose=0, backend='threading') as executor:
+            self._executor = executor
+            try:
+                if self._poly == 'hierarchical' and \
+                        not isinstance(self._data, _PolynomialDesign):
+                    if self._autoEnetParSel == True:
+                        self.fit_hyperparameters()
+                    self._train_hierarchical_candidates()
+                if self._coarse_pass is not None:
+                    self._train_coarse_ensemble()
+                if self._autoEnetParSel == True:
+                    self.fit_hyperparameters()
+                self._train_ensemble()
+            finally:
+                self._executor = None
+
+    @_timed('hyperparameters')
+    def fit_hyperparameters(self):
+        """
+        Preselect the best combination of ``C`` and ``l1_ratio`` with 
+        cross-validation or, if ``BIC=True``, with the Bayesian information
+        criterion. Only applicable if ``autoEnetParSel=True``. 
+        ``train()`` calls this method if it was not called before, hence 
+        the object can be constructed without running the search.
+        
+        RETURNS
+        -------
+        <tuple>
+            A tuple (C, l1_ratio).
+        """
+        if self._autoEnetParSel == False:
+            sys.exit('autoEnetParSel=False - all combinations of C and '
+                     'l1_ratios are used!')
+        if self._hyperparameters_fitted == False:
+            if self._BIC == False and self._model_based_search is not None:
+                C, l1_ratio = self._par_selection_model_based()
+            elif self._BIC == False:
+                C, l1_ratio = self._par_selection(C=self._C, 
+                                                  l1_ratios=self._l1_ratios)
+            else:
+                C, l1_ratio = self._par_selection_BIC(C=self._C, 
+                                                      l1_ratios=self._l1_ratios)
+            self._C = [C]
+            self._l1_ratios = [l1_ratio]
+            self._hyperparameters_fitted = True
+        return self._C[0], self._l1_ratios[0]
+
+    def _par_selection_model_based(self):
+        """
+        Model-based search for ``C`` and ``l1_ratio``. The search space is 
+        mapped to the unit square, with ``C`` on a log scale. After a Latin 
+        hypercube design of ``n_initial`` combinations, a Gaussian process 
+        is fitted to the harmonic mean of the normalized cross-validated 
+        score and zeros of all evaluated combinations. The next batch 
+        consists of the candidates with the highest expected improvement, 
+        where each chosen candidate is added with its predicted value 
+        before the next one is chosen, such that a batch is spread out.
+        
+        RETURNS
+        -------
+        <tuple>
+            - First entry: suggested `C` parameter.
+            - Second entry: suggested `l1 ratio`.
+        """
+        settings = self._model_based_search
+        n_evaluations = settings['n_evaluations']
+        batch_size = settings['batch_size']
+        if batch_size is None:
+            batch_size = effective_n_jobs(-1)
+        lower = np.array([np.log10(min(self._C)), min(self._l1_ratios)])
+        upper = np.array([np.log10(max(self._C)), max(self._l1_ratios)])
+
+        def to_params(x):
+            point = lower + x * (upper - lower)
+            return float(10 ** point[0]), float(point[1])
+
+        rng = np.random.RandomState(self._random_state)
+        cv = self._cv_splitter()
+
+        def evaluate(x):
+            return self._cv_evaluate(*to_params(x), cv)
+
+        # Latin hypercube design
+        n_initial = min(settings['n_initial'], n_evaluations)
+        batch = (np.column_stack([rng.permutation(n_initial), 
+                                  rng.permutation(n_initial)]) + 
+                 rng.uniform(size=(n_initial, 2))) / n_initial
+        X = np.empty((0, 2))
+        scores = np.empty(0)
+        zeros = np.empty(0)
+        while True:
+            results = np.array(self._parallel(evaluate, batch), dtype=float)
+            X = np.vstack([X, batch])
+            scores = np.concatenate([scores, results[:, 0]])
+            zeros = np.concatenate([zeros, results[:, 1]])
+            if self._verbose > 1:
+                for x, (score, zero) in zip(batch, results):
+                    print('C = ', to_params(x)[0], 'l1 = ', to_params(x)[1],
+                          'score = ', score, 'zeros = ', zero)
+            if len(X) >= n_evaluations:
+                break
+            batch = self._propose_batch(
+                X, self._harmonic_criterion(scores, zeros), 
+                min(batch_size, n_evaluations - len(X)), rng)
+
+        criterion = self._harmonic_criterion(scores, zeros)
+        params = [to_params(x) for x in X]
+        self._search_history = pd.DataFrame({
+            'C': [C for C, _ in params], 
+            'l1_ratio': [l1 for _, l1 in params],
+            'score': scores, 'zeros': zeros, 'harmonic mean': criterion})
+        return params[int(np.argmax(criterion))]
+
+    def _harmonic_criterion(self, scores, zeros):
+        """
+        Harmonic mean of min-max normalized scores and zeros, as in the grid
+        search. Combinations without selected features get 0. If all scores
+        are equal, only the zeros count.
+        
+        RETURNS
+        -------
+        <numpy array>
+            Criterion for each combination.
+        """
+        selected = ~np.isnan(scores)
+        normed = []
+        for values in [scores, zeros]:
+            values = np.where(selected, values, 
+                              np.nanmin(values) if np.any(selected) else 0)
+            value_range = np.max(values) - np.min(values)
+            normed.append((values - np.min(values)) / value_range 
+                          if value_range > 0 else np.ones(len(values)))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            criterion = 2 * normed[0] * normed[1] / (normed[0] + normed[1])
+        return np.where(selected, np.nan_to_num(criterion), 0)
+
+    def _propose_batch(self, X, y, size, rng, n_candidates=2000):
+        """
+        Candidates in the unit square with the highest expected improvement
+        under a Gaussian process fitted to ``(X, y)``. After each choice, 
+        the candidate is added with its predicted mean (constant liar).
+        
+        RETURNS
+        -------
+        <numpy array>
+            Matrix of shape (size, 2).
+        """
+        best = X[np.argmax(y)]
+        candidates = np.vstack([
+            rng.uniform(size=(n_candidates, 2)),
+            np.clip(best + 0.05 * rng.standard_normal((n_candidates // 4, 2)),
+                    0, 1)])
+        batch = []
+        for _ in range(size):
+            mean, std = self._gaussian_process(X, y, candidates)
+            improvement = mean - np.max(y)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                z = improvement / std
+                expected = np.where(std > 0, improvement * norm.cdf(z) + 
+                                    std * norm.pdf(z), 0)
+            choice = int(np.argmax(expected))
+            batch.append(candidates[choice])
+            X = np.vstack([X, candidates[choice]])
+            y = np.append(y, mean[choice])
+            candidates = np.delete(candidates, choice, axis=0)
+        return np.array(batch)
+
+    def _gaussian_process(self, X, y, candidates, noise=1e-3):
+        """
+        Posterior mean and standard deviation of a Gaussian process with 
+        squared exponential kernel. The length scale is chosen by the 
+        marginal likelihood from a small set of values.
+        
+        RETURNS
+        -------
+        <tuple>
+            Mean and standard deviation at ``candidates``.
+        """
+        y_mean = np.mean(y)
+        y_std = np.std(y) if np.std(y) > 0 else 1
+        target = (y - y_mean) / y_std
+        distances = np.sum((X[:, None, :] - X[None, :, :]) ** 2, axis=2)
+        best = None
+        for length_scale in [0.05, 0.1, 0.2, 0.3, 0.5, 1.0]:
+            kernel = np.exp(-distances / (2 * length_scale ** 2)) + \
+                noise * np.eye(len(X))
+            cholesky = np.linalg.cholesky(kernel)
+            alpha = np.linalg.solve(cholesky.T, 
+                                    np.linalg.solve(cholesky, target))
+            likelihood = -0.5 * target @ alpha - \
+                np.sum(np.log(np.diag(cholesky)))
+            if best is None or likelihood > best[0]:
+                best = (likelihood, length_scale, cholesky, alpha)
+        _, length_scale, cholesky, alpha = best
+        cross = np.exp(-np.sum((candidates[:, None, :] - X[None, :, :]) ** 2, 
+                               axis=2) / (2 * length_scale ** 2))
+        mean = cross @ alpha
+        v = np.linalg.solve(cholesky, cross.T)
+        std = np.sqrt(np.maximum(1 - np.sum(v ** 2, axis=0), 0))
+        return mean * y_std + y_mean, std * y_std
+
+    def get_search_history(self):
+        """
+        Combinations evaluated by the model-based search 
+        (``model_based_search``) in the order of evaluation.
+        
+        RETURNS
+        -------
+        <pandas dataframe>
+            ``C``, ``l1_ratio``, cross-validated score, average percentage of
+            zero weights and the harmonic mean of the normalized score and 
+            zeros for each combination.
         """
+        if not hasattr(self, '_search_history'):
+            sys.exit('Run fit_hyperparameters() or train() with '
+                     'model_based_search first!')
+        return self._search_history
+
+    def _train_hierarchical_candidates(self):
+        """
+        First stage of ``poly='hierarchical'``: train the ensemble on the 
+        base features and add squares and interactions of the features 
+        passing ``poly_tau_cutoffs``.
+        """
+        self._train_ensemble()
+        self._interaction_candidates = self.select_features(
+            *self._poly_tau_cutoffs)
+        if self._verbose > 0:
+            print('interaction candidates:', 
+                  [self._feat_names[c] for c in self._interaction_candidates])
+
+        self._data = _PolynomialDesign(self._get_data(), self._feat_names,
+                                       interaction_only=False,
+                                       candidates=self._interaction_candidates,
+                                       dtype=self._dtype)
+        self._feat_names = self._data.feature_names
+        # Criteria of the first stage do not match the new features
+        self._summary_df, self._sel_var, self._perc = None, None, None
+        self._active_features = self._screen_features()
+
+        # Hyperparameters selected on the base features need not suit the
+        # expanded features, hence train() repeats the search on the full 
+        # grid
+        if self._autoEnetParSel == True:
+            self._C, self._l1_ratios = self._hyperparameter_grid
+            self._hyperparameters_fitted = False
+
+    def _train_coarse_ensemble(self):
+        """
+        Train a fast ensemble with the settings in ``coarse_pass`` and keep
+        only features whose tau_1 exceeds ``coarse_pass['tau_1_cutoff']`` in
+        at least one hyperparameter combination.
+        """
+        K, max_iter, tol = self._K, self._max_iter, self._tol
+        successive_halving = self._successive_halving
+        self._K = self._coarse_pass['K']
+        self._max_iter = self._coarse_pass['max_iter']
+        self._tol = self._coarse_pass['tol']
+        # tau_1 is needed for all combinations
+        self._successive_halving = None
+        try:
+            with warnings.catch_warnings():
+                # Non-converged fits are expected in the coarse pass
+                warnings.simplefilter('ignore', category=ConvergenceWarning)
+                self._train_ensemble()
+        finally:
+            self._K, self._max_iter, self._tol = K, max_iter, tol
+            self._successive_halving = successive_halving
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            tau_1 = np.nan_to_num(np.max([
+                np.count_nonzero(self._weight_dict[k], axis=0) / 
+                self._eligibility_counts(*k)
+                for k in self._weight_dict], axis=0))
+        passed = np.where(tau_1 > self._coarse_pass['tau_1_cutoff'])[0]
+        if len(passed) == 0:
+            warnings.warn('No feature passed the coarse pass - '
+                          'all features are used.')
+        else:
+            self._active_features = passed
+            self._screening_candidates = passed
+        if self._verbose > 0:
+            print('features after coarse pass:', len(self._active_features))
+
+    def _train_ensemble(self):
+        """
+        Train the ``K`` models for each hyperparameter combination and 
+        find the best combination.
+        """
+        self._init_ensemble_results()
         np.random.seed(0)
         self._random_testsizes = np.random.uniform(self._testsize_range[0],
                                                   self._testsize_range[1],
                                                   self._K)
 
-        # Initiate dictionaries. Keys are (C, K, num_w_init)
-        self._weight_dict = {}
+        # Initiate dictionaries. Scores are keyed by (C, l1, K), weights are
+        # stored in one preallocated K x p matrix per (C, l1), where row K
+        # holds the coefficients of model K.
+        self._weight_dict = {
+            (C, l1): np.zeros((self._K, self._data.shape[1]), 
+                              dtype=self._dtype)
+            for C in self._C for l1 in self._l1_ratios}
+        # In random-subspace mode, entry (K, j) tells whether feature j 
+        # was eligible for model K
+        self._eligible_dict = None
+        if self._subspace is not None:
+            self._eligible_dict = {
+                (C, l1): np.ones((self._K, self._data.shape[1]), dtype=bool)
+                for C in self._C for l1 in self._l1_ratios}
         self._score_dict = {}
-        self._weight_list = []
         self._score_list = []
+        # Solver statistics keyed by (C, l1, K)
+        self._fit_diagnostics = {}
+
+        # Number of trained models per (C, l1)
+        self._n_models = {}
 
         # stop runtime
         start = time.time()
         # Call parallelization function
-        Parallel(n_jobs=-1, verbose=0, backend='threading')(
-             map(delayed(self.run_parallel), range(self._K)))
+        cells = [(C, l1) for C in self._C for l1 in self._l1_ratios]
+        self._fit_pilots(cells)
+        if self._successive_halving is None:
+            self._run_models(cells, 0, self._K)
+        else:
+            cells = self._successive_halving_rounds(cells)
         ende = time.time()
         self._runtime = ende-start
 
         # find best parameter setting and matrices
-        result_list=[]
-        for l1 in self._l1_ratios:
-            for C in self._C:
-                spec_result_list = []
-                for k in self._score_dict.keys():
-                    if k[0] == C and k[1] ==l1:
-                        spec_result_list.append(self._score_dict[k])
-                result_list.append(spec_result_list)
-
-        means=[]
-        for r in range(len(result_list)):
-            means.append(np.mean(result_list[r]))
-
-        self._scores_df = pd.DataFrame(np.array(means).reshape(\
-                                  len(self._l1_ratios), \
-                                  len(self._C)), \
-        index= self._l1_ratios, columns = self._C)
-
-        self._zeros_df = pd.DataFrame(index = self._l1_ratios,\
-                                   columns=self._C)
-        for l1 in self._l1_ratios:
-            for C in self._C:
-                count = 0
-                for K in range(self._K):
-                    nz = \
-                    len(np.where(pd.DataFrame(self._weight_dict[(C, l1, K)\
-])==0)[0])
-                    count = count + nz / len(self._feat_names)
-                count = count / (self._K)
-                self._zeros_df.loc[l1, C] = count
-
-        if len(self._C)>1 or len(self._l1_ratios)>1:
-            normed_scores = pd.DataFrame(self._min_max(
-                self._scores_df.copy().values))
-            normed_zeros = pd.DataFrame(self._min_max(
-                self._zeros_df.copy().values))
-            normed_zeros = normed_zeros.astype('float')
-            self._combination = 2 * ((normed_scores.copy().applymap(self._inv) + \
-                                        normed_zeros.copy().applymap(
-                                            self._inv)).applymap(self._inv))
-        else:
-            self._combination = 2 * ((self._scores_df.copy().applymap(self._inv) + \
-                                 self._zeros_df.copy().applymap(
-                                     self._inv)).applymap(self._inv))
-        self._combination.index = self._scores_df.index.copy()
-        self._combination.columns = self._scores_df.columns.copy()
+        self._scores_df, self._zeros_df, self._combination = \
+            self._cell_criteria(self._n_models.keys())
 
         self._scores_df.columns.name = 'Scores'
         self._zeros_df.columns.name = 'Zeros'
         self._combination.columns.name = 'Harmonic Mean'
 
+        # Only combinations trained with all K models are candidates
+        combination = self._combination.copy()
+        for C in self._C:
+            for l1 in self._l1_ratios:
+                if (C, l1) not in cells:
+                    combination.loc[l1, C] = np.nan
         best_row, best_col  = np.where(
-            self._combination == np.nanmax(self._combination.values))
-        self._best_l1_ratio = self._combination.index[np.nanmax(best_row)]
-        self._best_C = self._combination.columns[np.nanmin(best_col)]
+            combination == np.nanmax(combination.values))
+        self._best_l1_ratio = combination.index[np.nanmax(best_row)]
+        self._best_C = combination.columns[np.nanmin(best_col)]
+
+    @_timed('pilots')
+    def _fit_pilots(self, cells):
+        """
+        If ``warm_start=True``, fit one pilot model per (C, l1) combination
+        on all objects and store its coefficients for all features.
+        """
+        self._pilot_coef = {}
+        if self._warm_start == False:
+            return
+        # Pilots only provide starting values, hence the objects are capped 
+        # like the train objects of the models, stratified for 
+        # classification
+        rows = self._cap_rows(np.arange(self._data.shape[0]), 
+                              self._train_size, 0, stratify=self._strata())
+        train_data, _ = self._split_data(rows)
+        target = np.asarray(self._target)[rows]
+
+        def fit_pilot(cell):
+            model = self._elementary_model(*cell).fit(train_data, target)
+            coef = np.zeros(self._data.shape[1])
+            coef[self._active_features] = model.coef_.ravel()
+            return cell, (coef, model.intercept_)
+
+        self._pilot_coef = dict(self._parallel(fit_pilot, cells))
+
+    def _run_models(self, cells, start, stop):
+        """
+        Train models ``start`` to ``stop - 1`` of the given (C, l1) 
+        combinations in parallel.
+        """
+        self._cells = list(cells)
+        self._parallel(self.run_parallel, range(start, stop))
+        for cell in self._cells:
+            self._n_models[cell] = stop
 
+    def _successive_halving_rounds(self, cells):
+        """
+        Successive halving over the (C, l1) combinations. All combinations
+        start with ``min_K`` models. After each round, only the best 
+        ``1 / factor`` of the combinations w.r.t. the harmonic mean of 
+        scores and zeros are kept, and the number of models of the kept 
+        combinations is multiplied by ``factor``, until it reaches ``K``.
+        
+        RETURNS
+        -------
+        <list>
+            Combinations trained with all ``K`` models.
+        """
+        factor = self._successive_halving['factor']
+        trained = 0
+        n_models = min(self._successive_halving['min_K'], self._K)
+        while True:
+            self._run_models(cells, trained, n_models)
+            trained = n_models
+            if trained == self._K:
+                return cells
+            if len(cells) > 1:
+                combination = self._cell_criteria(cells)[2]
+                values = np.array([combination.loc[l1, C] 
+                                   for C, l1 in cells], dtype=float)
+                values[np.isnan(values)] = -np.inf
+                keep = int(np.ceil(len(cells) / factor))
+                best = np.sort(np.argsort(-values, kind='stable')[:keep])
+                cells = [cells[i] for i in best]
+                if self._verbose > 0:
+                    print('models:', trained, ', kept combinations:', cells)
+            n_models = min(n_models * factor, self._K)
+
+    @_timed('aggregation')
+    def _cell_criteria(self, cells):
+        """
+        Average score, average percentage of zero weights and their 
+        harmonic mean for (C, l1) combinations, each over its trained models.
+        
+        PARAMETERS
+        ----------
+        <iterable>
+            ``cells``: (C, l1) combinations. Other combinations are ``NaN``.
+            
+        RETURNS
+        -------
+        <tuple>
+            Scores, zeros and harmonic means as dataframes with rows 
+            ``l1_ratios`` and columns ``C``.
+        """
+        cells = set(cells)
+        scores_df = pd.DataFrame(index=self._l1_ratios, columns=self._C,
+                                 dtype=float)
+        zeros_df = pd.DataFrame(index=self._l1_ratios, columns=self._C)
+        for l1 in self._l1_ratios:
+            for C in self._C:
+                if (C, l1) not in cells:
+                    continue
+                n_models = self._n_models[(C, l1)]
+                scores_df.loc[l1, C] = np.mean(
+                    [self._score_dict[(C, l1, K)] for K in range(n_models)])
+                # average percentage of zero weights over the trained models
+                weights = self._weight_dict[(C, l1)][:n_models]
+                if self._eligible_dict is None:
+                    zeros_df.loc[l1, C] = np.mean(weights == 0)
+                else:
+                    eligible = self._eligible_dict[(C, l1)][:n_models]
+                    zeros_df.loc[l1, C] = np.sum(
+                        (weights == 0) & eligible) / np.sum(eligible)
+
+        if len(self._C)>1 or len(self._l1_ratios)>1:
+            normed_scores = pd.DataFrame(self._min_max(
+                scores_df.copy().values))
+            normed_zeros = pd.DataFrame(self._min_max(
+                zeros_df.copy().values.astype(float)))
+            combination = 2 * ((normed_scores.copy().applymap(self._inv) + \
+                                normed_zeros.copy().applymap(
+                                    self._inv)).applymap(self._inv))
+        else:
+            combination = 2 * ((scores_df.copy().applymap(self._inv) + \
+                                zeros_df.copy().applymap(
+                                    self._inv)).applymap(self._inv))
+        combination.index = scores_df.index.copy()
+        combination.columns = scores_df.columns.copy()
+        return scores_df, zeros_df, combination
+
+    @_timed('selection')
     def select_features(self, tau_1_cutoff=0.9, tau_2_cutoff=0.9, tau_3_cutoff=0.975):
         """
         Selects features based on the cutoff values for tau_1_cutoff, 
-        tau_2_cutoff and tau_3_cutoff.
+        tau_2_cutoff and tau_3_cutoff. If ``subspace`` is set, the criteria
+        of a feature are computed over the models it was eligible for.
         
         Parameters
         ----------
@@ -355,21 +1648,37 @@ class RENT_Base(ABC):
         if not hasattr(self, '_best_C'):
             sys.exit('Run train() first!')
 
-        #Loop through all K models
-        weight_list = [self._weight_dict[(self._best_C,
-                                                 self._best_l1_ratio,
-                                                 K)] for K in range(self._K)]
-        weight_array = np.vstack(weight_list)
+        # Weights of all K models
+        weight_array = self._weight_dict[(self._best_C, self._best_l1_ratio)]
 
         #Compute results based on weights
         counts = np.count_nonzero(weight_array, axis=0)
-        self._perc = counts / len(weight_list)
-        means = np.mean(weight_array, axis=0)
-        stds = np.std(weight_array, axis=0)
-        signum = np.apply_along_axis(self._sign_vote, 0, weight_array)
-        t_test = t.cdf(
-            abs(means / np.sqrt((stds ** 2) / len(weight_list))), \
-                (len(weight_list)-1))
+        if self._eligible_dict is None:
+            self._perc = counts / self._K
+            means = np.mean(weight_array, axis=0, dtype=np.float64)
+            stds = np.std(weight_array, axis=0, dtype=np.float64)
+            signum = np.apply_along_axis(self._sign_vote, 0, weight_array)
+            t_test = t.cdf(
+                abs(means / np.sqrt((stds ** 2) / self._K)), \
+                    (self._K-1))
+        else:
+            # Weights of non-eligible features are 0, hence sums over all 
+            # models equal sums over the eligible models
+            n_eligible = self._eligibility_counts(self._best_C, 
+                                                  self._best_l1_ratio)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                self._perc = np.nan_to_num(counts / n_eligible)
+                means = np.sum(weight_array, axis=0, 
+                               dtype=np.float64) / n_eligible
+                stds = np.sqrt(np.maximum(
+                    np.sum(np.square(weight_array, dtype=np.float64), 
+                           axis=0) / n_eligible - 
+                    means ** 2, 0))
+                signum = np.nan_to_num(np.abs(
+                    np.sum(np.sign(weight_array), axis=0)) / n_eligible)
+                t_test = np.nan_to_num(t.cdf(
+                    abs(means / np.sqrt((stds ** 2) / n_eligible)),
+                    n_eligible - 1))
 
         # Conduct a dataframe that stores the results for the criteria
         summary = np.vstack([self._perc, signum, t_test])
@@ -410,7 +1719,8 @@ class RENT_Base(ABC):
                 for k, t3 in enumerate(parameters['t3']):
                     sel_feat = self.select_features(t1, t2, t3)
 
-                    train_data = sc.fit_transform(self._data.iloc[:,sel_feat])
+                    train_data = sc.fit_transform(
+                        self._get_data(columns=sel_feat, dense=True))
                     lr = LogisticRegression().fit(train_data, self._target)
                     num_params = len(np.where(lr.coef_ != 0)[1]) + 1
                     pred_proba = lr.predict_proba(train_data)
@@ -422,23 +1732,53 @@ class RENT_Base(ABC):
                     
         return BIC
 
-    def get_summary_criteria(self):
+    @_timed('summaries')
+    def get_summary_criteria(self, expand=False):
         """
         Summary statistic of the selection criteria tau_1, tau_2 and 
         tau_3 (described in ``select_features()``)
         for each feature. All three criteria are in [0,1] .
         
+        PARAMETERS
+        ----------
+        expand : <boolean>
+            If ``cluster_threshold`` is set, return the criteria of each 
+            cluster for all of its member features. Default: ``expand=False``.
+        
         RETURNS
         -------
         <pandas dataframe>
             Matrix where rows represent selection criteria and 
             columns represent features.
         """
-        if not hasattr(self, '_summary_df'):
+        if getattr(self, '_summary_df', None) is None:
             sys.exit('Run select_features() first!')
+        if expand == True and self._clusters is not None:
+            summary_df = self._summary_df.iloc[:, self._clusters.labels]
+            summary_df.columns = self._clusters.member_names
+            return summary_df
         return self._summary_df
 
-    def get_weight_distributions(self, binary = False):
+    def get_feature_clusters(self):
+        """
+        Clusters of highly correlated features (see ``cluster_threshold``).
+        
+        RETURNS
+        -------
+        <pandas dataframe>
+            One row per original feature with its cluster, the feature 
+            representing the cluster and the sign of its correlation with 
+            that feature.
+        """
+        if self._clusters is None:
+            sys.exit('No feature clusters - set cluster_threshold!')
+        return pd.DataFrame({
+            'cluster': self._clusters.labels,
+            'representative': np.asarray(self._clusters.feature_names, 
+                                         dtype=object)[self._clusters.labels],
+            'sign': self._clusters.signs}, index=self._clusters.member_names)
+
+    def get_weight_distributions(self, binary = False, as_array = False):
         """
         In each of the ``K`` models, feature weights are fitted, i.e. 
         an individiual weight is assigned feature 1 for model 1, 
@@ -452,28 +1792,31 @@ class RENT_Base(ABC):
                 - ``binary=True`` : binary matrix where entry is 1 \
                     for each weight unequal to 0.
                 - ``binary=False`` : original weight matrix.
+        as_array : <boolean>
+            Return the raw numpy array without feature and model names, which
+            avoids building a dataframe for a large number of features. 
+            Default: ``as_array=False``.
                 
         RETURNS
         -------
-        <pandas dataframe>
+        <pandas dataframe> or <numpy array>
             Weight matrix. Rows represent models (1:K), 
-            columns represents features.
+            columns represents features. Unless ``binary=True``, the 
+            returned object is a view on the stored weights.
         """
         if not hasattr(self, '_weight_dict'):
             sys.exit('Run train() first!')
 
-        weights_df = pd.DataFrame()
-        for k in self._weight_dict.keys():
-            if k[0] == self._best_C and k[1] == self._best_l1_ratio:
-                weights_df = weights_df.append( \
-                        pd.DataFrame(self._weight_dict[k]))
-        weights_df.index = ['mod {0}'.format(x+1) for x in range(self._K)]
-        weights_df.columns = self._feat_names
-        
+        weights = self._weight_dict[(self._best_C, self._best_l1_ratio)]
         if binary == True:
-            return((weights_df != 0).astype(np.int_))
-        else:
-            return(weights_df)
+            weights = (weights != 0).astype(np.int_)
+
+        if as_array == True:
+            return weights
+        return pd.DataFrame(weights,
+                            index=['mod {0}'.format(x+1) for x in range(self._K)],
+                            columns=self._feat_names,
+                            copy=False)
 
     def get_scores_list(self):
         """
@@ -484,9 +1827,8 @@ class RENT_Base(ABC):
             Scores list.
         """
         return [
-            self._score_dict[k]
-            for k in self._score_dict.keys()
-            if k[0] == self._best_C and k[1] == self._best_l1_ratio
+            self._score_dict[(self._best_C, self._best_l1_ratio, K)]
+            for K in range(self._K)
         ]
 
     def get_enetParam_matrices(self):
@@ -526,6 +1868,10 @@ class RENT_Base(ABC):
                     harmonic mean is selected.
         """
         if self._autoEnetParSel == True and self._BIC ==False:
+            if self._model_based_search is not None:
+                sys.exit('Use get_search_history() for model_based_search!')
+            if self._hyperparameters_fitted == False:
+                sys.exit('Run fit_hyperparameters() or train() first!')
             return self._scores_df_cv, self._zeros_df_cv, self._combination_cv
         else:
             print("autoEnetParSel=False or BIC=True - parameters have not been selected with cross-validation.")
@@ -539,6 +1885,8 @@ class RENT_Base(ABC):
             Dataframe of BIC values.
         """
         if self._autoEnetParSel == True and self._BIC ==True:
+            if self._hyperparameters_fitted == False:
+                sys.exit('Run fit_hyperparameters() or train() first!')
             return self._BIC_df
         else:
             print("BIC=False - parameters have not been selected with BIC.")
@@ -559,6 +1907,139 @@ class RENT_Base(ABC):
             sys.exit('Run train() first!')
         return self._best_C, self._best_l1_ratio
     
+    def _record_fit(self, C, l1, K, model, seconds):
+        """
+        Store number of iterations, convergence, time in seconds and number
+        of nonzero coefficients of the fitted model of combination 
+        (``C``, ``l1``) on train-test split ``K``.
+        """
+        n_iter = int(np.max(model.n_iter_))
+        converged = model.converged_ if hasattr(model, 'converged_') else \
+            n_iter < model.max_iter
+        self._fit_diagnostics[(C, l1, K)] = (
+            n_iter, converged, seconds, np.count_nonzero(model.coef_))
+
+    def get_fit_diagnostics(self, summary=False):
+        """
+        Solver statistics of the ``K`` models of each combination of ``C`` 
+        and ``l1_ratios`` in the last training. A model counts as not 
+        converged if its solver stopped at ``max_iter``. For 
+        ``engine='path'``, the time of a path is split evenly among the 
+        models on it.
+        
+        ``n_iter`` counts different iterations per solver:
+        
+            - ``classifier='enet_cd'`` : IRLS iterations over all \
+                penalties of its path. The model also counts as not \
+                converged if an inner coordinate descent stopped at \
+                ``max_iter`` or a step did not decrease the objective.
+            - ``classifier='logreg'`` with solver saga : epochs over the \
+                train objects.
+            - ``classifier='logreg'`` with solver lbfgs or liblinear \
+                (``solver_policy='auto'``) : iterations of the solver.
+            - Regression : coordinate descent epochs.
+        
+        PARAMETERS
+        ----------
+        summary : <boolean>
+            Summarize the models of each combination. 
+            Default: ``summary=False``.
+        
+        RETURNS
+        -------
+        <pandas dataframe>
+            - ``summary=False`` : one row per model with columns ``C``, \
+                ``l1_ratio``, ``K``, ``n_iter``, ``converged``, ``time`` \
+                and ``nonzero``.
+            - ``summary=True`` : one row per combination with the number \
+                of models, mean and maximum ``n_iter``, number of models \
+                that did not converge, total and mean ``time`` and mean \
+                ``nonzero``.
+        """
+        if not hasattr(self, '_best_C'):
+            sys.exit('Run train() first!')
+        keys = sorted(self._fit_diagnostics)
+        diagnostics = pd.DataFrame(
+            [self._fit_diagnostics[key] for key in keys],
+            columns=['n_iter', 'converged', 'time', 'nonzero'])
+        diagnostics.insert(0, 'K', [K for _, _, K in keys])
+        diagnostics.insert(0, 'l1_ratio', [l1 for _, l1, _ in keys])
+        diagnostics.insert(0, 'C', [C for C, _, _ in keys])
+        if summary == False:
+            return diagnostics
+
+        diagnostics['not converged'] = ~diagnostics['converged']
+        return diagnostics.groupby(['C', 'l1_ratio']).agg(
+            models=('K', 'size'), mean_n_iter=('n_iter', 'mean'),
+            max_n_iter=('n_iter', 'max'), 
+            not_converged=('not converged', 'sum'),
+            total_time=('time', 'sum'), mean_time=('time', 'mean'),
+            mean_nonzero=('nonzero', 'mean'))
+
+    def get_phase_times(self, per_worker=False):
+        """
+        Accumulated wall and CPU time in seconds per phase since the object
+        was created. Phases are ``'setup'`` (constructor), 
+        ``'hyperparameters'``, ``'pilots'`` (``warm_start``), and per model
+        ``'split'`` (train-test split, screening and subspace), 
+        ``'scaling'`` (extraction and standardization of the split data and
+        the Gram matrix of ``engine='path'``), 
+        ``'fit'``, ``'score'`` (predictions and score) and ``'merge'`` 
+        (storing the results), followed by ``'aggregation'`` (criteria of 
+        the combinations), ``'selection'`` (``select_features()``), 
+        ``'summaries'`` and ``'validation'``. Phases of the models are 
+        measured in the worker threads, hence their total time can exceed 
+        the training time. CPU time only includes the measured threads.
+        
+        PARAMETERS
+        ----------
+        per_worker : <boolean>
+            Times per phase and worker. Workers are ``'main'`` and 
+            ``'worker <i>'``, numbered anew in each ``train()``, such that
+            repeated training adds to the same workers. 
+            Default: ``per_worker=False``.
+            
+        RETURNS
+        -------
+        <pandas dataframe>
+            Columns ``wall``, ``cpu`` and ``calls``, index phase (and 
+            worker).
+        """
+        return self._timer.to_frame(per_worker)
+
+    def export_phase_times(self, path=None):
+        """
+        Phase times of ``get_phase_times()`` as JSON, with the total times 
+        per phase under ``'phases'`` and the times per worker thread under 
+        ``'workers'``.
+        
+        PARAMETERS
+        ----------
+        path : <None or str>
+            File the JSON is written to. Default: ``path=None``.
+            
+        RETURNS
+        -------
+        <str>
+            JSON document.
+        """
+        phases = self._timer.to_frame()
+        workers = {}
+        for (phase, worker), row in \
+                self._timer.to_frame(per_worker=True).iterrows():
+            workers.setdefault(worker, {})[phase] = {
+                'wall': row['wall'], 'cpu': row['cpu'], 
+                'calls': int(row['calls'])}
+        document = json.dumps({
+            'phases': {phase: {'wall': row['wall'], 'cpu': row['cpu'],
+                               'calls': int(row['calls'])}
+                       for phase, row in phases.iterrows()},
+            'workers': workers}, indent=2)
+        if path is not None:
+            with open(path, 'w') as f:
+                f.write(document)
+        return document
+
     def get_runtime(self):
         """
         Total RENT training time in seconds.
@@ -585,6 +2066,14 @@ class RENT_Base(ABC):
         
         if (C not in self._C) | (l1_ratio not in self._l1_ratios):
             sys.exit('No weights calculated for this combination!')
+        # Successive halving stops pruned combinations before K models
+        if hasattr(self, '_n_models') and \
+                self._n_models.get((C, l1_ratio), 0) < self._K:
+            trained = [cell for cell, n in self._n_models.items() 
+                       if n == self._K]
+            sys.exit('Combination was pruned by successive halving, only '
+                     'these (C, l1_ratio) were trained with K models: ' + 
+                     str(trained))
         self._best_C = C
         self._best_l1_ratio = l1_ratio
 
@@ -592,7 +2081,7 @@ class RENT_Base(ABC):
         """
         Barplot of tau_1 value for each feature.
         """
-        if not hasattr(self, '_perc'):
+        if getattr(self, '_perc', None) is None:
             sys.exit('Run select_features() first!')
 
         plt.figure(figsize=(10, 7))
@@ -672,7 +2161,7 @@ class RENT_Base(ABC):
             sys.exit(" 'cl' must be either 0, 1, 'both' or 'continuous'")
         if problem not in ['class', 'regression']:
             sys.exit(" 'problem' must be either 'class' or 'regression' ")
-        if not hasattr(self, '_sel_var'):
+        if getattr(self, '_sel_var', None) is None:
             sys.exit('Run select_features() first!')
         if not hasattr(self, '_incorrect_labels'):
             sys.exit('Run get_summary_objects() first!')
@@ -681,33 +2170,31 @@ class RENT_Base(ABC):
                      must be 'continuous' ")
         # catch if classification with continuous. (check if RENT class or RENT reg)
 
+        # Only the selected features are built if sel_vars=True
+        if sel_vars == True:
+            features = self._data_frame(self._sel_var)
+        else:
+            features = self._data_frame()
+
         if cl != 'continuous':
-            dat = pd.merge(self._data, self._incorrect_labels.iloc[:,[1,-1]], \
+            dat = pd.merge(features, self._incorrect_labels.iloc[:,[1,-1]], \
                                  left_index=True, right_index=True)
-            if sel_vars == True:
-                variables = list(self._sel_var)
-                variables.extend([-2,-1])
         else:
 
             if problem == "regression":
-                dat = pd.merge(self._data, self._incorrect_labels.iloc[:,-1], \
+                dat = pd.merge(features, self._incorrect_labels.iloc[:,-1], \
                                          left_index=True, right_index=True)
             else:
                 obj_mean = pd.DataFrame(np.nanmean( \
-                        self.get_object_probabilities(), 1), \
-                    index=self._data.index)
+                        self._pred_proba_dict[(self._best_C,
+                                               self._best_l1_ratio)], 1), \
+                    index=features.index)
                 obj_mean.columns = ["pred_means"]
-                dat = pd.merge(self._data, obj_mean, \
+                dat = pd.merge(features, obj_mean, \
                                          left_index=True, right_index=True)
-            if sel_vars == True:
-                variables = list(self._sel_var)
-                variables.extend([-1])
 
-        if sel_vars == True:
-            if cl in ['both', 'continuous']:
-                data = dat.iloc[:,variables]
-            else:
-                data = dat.iloc[np.where(dat.iloc[:,-2]==cl)[0],variables]
+        if sel_vars == True and cl not in ['both', 'continuous']:
+            data = dat.iloc[np.where(dat.iloc[:,-2]==cl)[0], :]
         else:
             data = dat
         if cl != 'continuous':
@@ -895,14 +2382,9 @@ class RENT_Base(ABC):
         alpha: <float>
             Significance level for the `t`-test. Default ``alpha=0.05``.
         """
-        if not hasattr(self, '_sel_var'):
+        if getattr(self, '_sel_var', None) is None:
             sys.exit('Run select_features() first!')
 
-        if self._poly != 'OFF':
-            test_data = pd.DataFrame(self._polynom.fit_transform(test_data))
-            test_data.columns = self._data.columns
-            self._test_data = test_data
-        
         score, VS1, VS2 = self._prepare_validation_study(test_data, 
                                                          test_labels, 
                                                          num_drawings, 
@@ -952,56 +2434,507 @@ class RENT_Base(ABC):
 
     def _inv(self, num):
         """
-        Invert a numeric value unequal to 0.
+        Invert a numeric value unequal to 0.
+        
+        PARAMETERS
+        ----------
+        <float>
+            ``num``: numeric value
+            
+        RETURNS
+        -------
+        <numeric value>
+            Inverted value. 
+        """
+        if num == 0:
+            return np.inf
+        elif num == np.inf:
+            return 0
+        else:
+            return num ** -1
+
+    def _sign_vote(self, arr):
+        """
+        Calculate tau_2.
+        
+        PARAMETERS
+        ----------
+        <numpy array>
+            ``arr``: Array of numeric values.
+            
+        RETURNS
+        -------
+        <numeric value>
+            Inverted value. 
+        """
+        return np.abs(np.sum(np.sign(arr))) / len(arr)
+
+    def _min_max(self, arr):
+        """
+        Min-max standardization. 
+        
+        PARAMETERS
+        ----------
+        <numpy array>
+            ``arr``: Array of numeric values.
+            
+        RETURNS
+        -------
+        <numpy array>
+            1-d array or matrix of higher dimension.
+        """
+        return (arr-np.nanmin(arr)) / (np.nanmax(arr)-np.nanmin(arr))
+
+    def _get_data(self, rows=slice(None), columns=None, dense=False):
+        """
+        Block of the data RENT is trained on. All methods access the 
+        data through this function, such that polynomial features are only
+        generated for the requested rows and columns. Without ``columns``, 
+        the full expansion is built.
+        
+        PARAMETERS
+        ----------
+        <numpy array> or <slice>
+            ``rows``: Row positions. Default: all rows.
+        <list> or <numpy array>
+            ``columns``: Column positions. Default: all columns.
+        <boolean>
+            ``dense``: Convert sparse blocks to a numpy array. 
+            Default: ``dense=False``.
+            
+        RETURNS
+        -------
+        <numpy array> or <scipy sparse matrix>
+            Data matrix. Sparse if the data is sparse and ``dense=False``.
+            A copy, unless both ``rows`` and ``columns`` are slices of 
+            dense data.
+        """
+        if isinstance(self._data, _PolynomialDesign):
+            return self._data.get(rows, columns)
+        if columns is None:
+            columns = slice(None)
+        if sparse.issparse(self._data):
+            block = self._data[:, columns][rows]
+            return block.toarray() if dense == True else block
+        # Only the requested block is read, e.g. from a memory map
+        if isinstance(rows, slice) or isinstance(columns, slice):
+            return np.asarray(self._data[rows][:, columns], dtype=self._dtype)
+        return np.asarray(self._data[np.ix_(rows, columns)], dtype=self._dtype)
+
+    def _parallel(self, function, arguments, verbose=0):
+        """
+        Call ``function`` for each argument in parallel threads. Within 
+        ``train()``, the pool of workers of ``train()`` is reused.
+        
+        PARAMETERS
+        ----------
+        <callable>
+            ``function``: Function to call.
+        <iterable>
+            ``arguments``: Arguments of the calls.
+        <int>
+            ``verbose``: Verbosity of a new pool. Default: ``verbose=0``.
+            
+        RETURNS
+        -------
+        <list>
+            Return values of the calls.
+        """
+        if self._executor is not None:
+            return self._executor(map(delayed(function), arguments))
+        return Parallel(n_jobs=-1, verbose=verbose, backend='threading')(
+            map(delayed(function), arguments))
+
+    def _as_array(self, data):
+        """
+        Data as one contiguous numpy array of type ``dtype`` in the layout
+        given by ``data_order``. Arrays that already fulfil this are not 
+        copied.
+        
+        PARAMETERS
+        ----------
+        <numpy array>
+            ``data``: Dense data.
+            
+        RETURNS
+        -------
+        <numpy array>
+            Data matrix.
+        """
+        if self._data_order == 'F':
+            return np.asfortranarray(data, dtype=self._dtype)
+        if self._data_order == 'C':
+            return np.ascontiguousarray(data, dtype=self._dtype)
+        data = np.asarray(data, dtype=self._dtype)
+        if not (data.flags.c_contiguous or data.flags.f_contiguous):
+            data = np.ascontiguousarray(data)
+        return data
+
+    def _data_frame(self, columns=None):
+        """
+        Data with object and feature names, only used to return or plot
+        data. Without ``columns`` and with polynomial features, this builds
+        the full dense expansion.
+        
+        PARAMETERS
+        ----------
+        <list> or <numpy array>
+            ``columns``: Column positions. Default: all columns.
+            
+        RETURNS
+        -------
+        <pandas dataframe>
+            Data matrix.
+        """
+        if columns is None:
+            columns = np.arange(self._data.shape[1])
+        return pd.DataFrame(self._get_data(columns=columns, dense=True),
+                            index=self._indices,
+                            columns=[self._feat_names[c] for c in columns])
+
+    def _split_data(self, train_ind, test_ind=None, columns=None):
+        """
+        Train and test block of the data, standardized with the train 
+        statistics if ``scale=True``.
+        
+        PARAMETERS
+        ----------
+        <numpy array>
+            ``train_ind``: Row positions of the train objects.
+        <numpy array>
+            ``test_ind``: Row positions of the test objects. Default: ``None``.
+        <numpy array>
+            ``columns``: Column positions. Default: the features kept by 
+            the screening, i.e. all features if ``screening=None``.
+            
+        RETURNS
+        -------
+        <tuple>
+            Train and test data as numpy arrays. The second entry is ``None`` 
+            if no test objects are given.
+        """
+        if columns is None:
+            columns = self._active_features
+        train_data = self._get_data(train_ind, columns)
+        test_data = None if test_ind is None else \
+            self._get_data(test_ind, columns)
+        if self._scale == True:
+            # Blocks are fresh copies, hence they can be scaled in place
+            sc = self._fit_scaler(train_data)
+            train_data = sc.transform(train_data)
+            if test_data is not None:
+                test_data = sc.transform(test_data)
+        return train_data, test_data
+
+    def _fit_scaler(self, block):
+        """
+        Scaler fitted on a train block. For dense blocks, mean and variance
+        are accumulated with ``partial_fit`` over blocks of rows, such that
+        no temporary copy of the whole block is created. Sparse blocks are
+        scaled without centering, which would destroy their sparsity.
+        
+        PARAMETERS
+        ----------
+        <numpy array> or <scipy sparse matrix>
+            ``block``: Train data.
+            
+        RETURNS
+        -------
+        <StandardScaler>
+            Fitted scaler. It scales in place.
+        """
+        sc = StandardScaler(copy=False, with_mean=not sparse.issparse(block))
+        if sparse.issparse(block):
+            return sc.fit(block)
+        for start in range(0, block.shape[0], self._row_chunk_size):
+            sc.partial_fit(block[start:start + self._row_chunk_size])
+        return sc
+
+    def _split_columns(self, train_ind):
+        """
+        Columns of a model of the ensemble or of a cross-validation fold of
+        the hyperparameter search. If ``screening_per_split=True``, features
+        are screened on the train objects only, such that the test objects 
+        do not take part in the screening. After a coarse pass, only its 
+        surviving features are screened.
+        
+        PARAMETERS
+        ----------
+        <numpy array>
+            ``train_ind``: Row positions of the train objects.
+            
+        RETURNS
+        -------
+        <numpy array>
+            Sorted column positions.
+        """
+        if self._screening_per_split == True:
+            return self._screen_features(train_ind, 
+                                         self._screening_candidates)
+        return self._active_features
+
+    def _screen_features(self, rows=slice(None), candidates=None):
+        """
+        Univariate screening. The marginal statistic of each feature is 
+        computed in one pass over the columns, chunk by chunk.
+        
+        PARAMETERS
+        ----------
+        <numpy array> or <slice>
+            ``rows``: Row positions the statistic is computed on. 
+            Default: all rows.
+        <numpy array>
+            ``candidates``: Sorted positions of the features to screen. 
+            Default: ``candidates=None``, i.e. all features.
+            
+        RETURNS
+        -------
+        <numpy array>
+            Sorted positions of the kept features. All candidates if 
+            ``screening=None``.
+        """
+        if candidates is None:
+            candidates = np.arange(self._data.shape[1])
+        if self._screening is None:
+            return candidates
+
+        y = np.asarray(self._target)[rows]
+        size = self._screening_size
+        if size is None:
+            size = int(len(y) / np.log(len(y)))
+        if size >= len(candidates):
+            return candidates
+
+        statistic = np.empty(len(candidates))
+        for start in range(0, len(candidates), self._chunk_size):
+            chunk = slice(start, min(start + self._chunk_size, 
+                                     len(candidates)))
+            with np.errstate(divide='ignore', invalid='ignore'):
+                statistic[chunk] = self._marginal_statistic(
+                    self._get_data(rows, candidates[chunk], dense=True), y)
+        # Constant features have an undefined statistic
+        statistic = np.nan_to_num(statistic, nan=0.0)
+
+        return candidates[np.sort(np.argpartition(-statistic, size - 1)[:size])]
+
+    def _cap_rows(self, ind, size, K, stratify=None):
+        """
+        Random subset of at most ``size`` row positions.
+        
+        PARAMETERS
+        ----------
+        <numpy array>
+            ``ind``: Row positions.
+        <None or int>
+            ``size``: Maximum number of rows. ``None`` keeps all rows.
+        <int>
+            ``K``: Model number, used as seed if ``random_state`` is set.
+        <numpy array>
+            ``stratify``: Class labels of the rows. Default: ``None``.
+            
+        RETURNS
+        -------
+        <numpy array>
+            Sorted row positions.
+        """
+        if size is None or len(ind) <= size:
+            return ind
+        ind = train_test_split(
+            ind, train_size=size, stratify=stratify,
+            random_state=None if self._random_state is None else K)[0]
+        return np.sort(ind)
+
+    def _draw_subspace(self, columns, K, C, l1):
+        """
+        Draw the random feature subset of model ``K`` and mark the features
+        that were not drawn as non-eligible.
         
         PARAMETERS
         ----------
+        <numpy array>
+            ``columns``: Candidate column positions.
+        <int>
+            ``K``: Model number.
         <float>
-            ``num``: numeric value
+            ``C``, ``l1``: Hyperparameters of the model.
             
         RETURNS
         -------
-        <numeric value>
-            Inverted value. 
+        <numpy array>
+            Sorted positions of the drawn features.
         """
-        if num == 0:
-            return np.inf
-        elif num == np.inf:
-            return 0
+        size = self._subspace
+        if isinstance(size, float):
+            size = int(np.ceil(size * len(columns)))
+        size = min(size, len(columns))
+        if self._random_state is None:
+            drawn = np.random.choice(columns, size, replace=False)
         else:
-            return num ** -1
+            drawn = np.random.RandomState(seed=K).choice(columns, size, 
+                                                         replace=False)
+        drawn = np.sort(drawn)
+        # Each model owns row K, hence no locking is needed
+        self._eligible_dict[(C, l1)][K, np.setdiff1d(columns, drawn)] = False
+        return drawn
+
+    def _eligibility_counts(self, C, l1):
+        """
+        Number of models each feature was eligible for.
+        
+        RETURNS
+        -------
+        <numpy array> or <int>
+            Counts per feature, or the number of models if ``subspace=None``.
+        """
+        if self._eligible_dict is None:
+            # Not self._K, which differs from the number of models of the
+            # coarse pass once its settings are restored
+            return self._weight_dict[(C, l1)].shape[0]
+        return np.sum(self._eligible_dict[(C, l1)], axis=0)
 
-    def _sign_vote(self, arr):
+    def _validation_columns(self, num_drawings):
         """
-        Calculate tau_2.
+        Features the validation study needs: the features selected by RENT
+        and the random feature drawings of VS1.
+        
+        PARAMETERS
+        ----------
+        <int>
+            ``num_drawings``: Number of feature drawings for VS1.
+            
+        RETURNS
+        -------
+        <tuple>
+            - First entry: list with the column indices of each drawing.
+            - Second entry: sorted array of all needed column indices.
+        """
+        drawings = [self._draw_validation_columns(K)
+                    for K in range(num_drawings)]
+        columns = np.unique(np.concatenate(
+            [np.asarray(self._sel_var, dtype=int)] + drawings))
+        return drawings, columns
+
+    def _scale_validation_data(self, test_data, columns):
+        """
+        Standardize the needed columns of train and test data of the 
+        validation study once. Standardization is columnwise, hence slicing 
+        the scaled matrices gives the same result as scaling each feature 
+        subset separately.
         
         PARAMETERS
         ----------
+        <numpy array> or <pandas dataframe>
+            ``test_data``: Test dataset of the validation study, without
+            polynomial features.
         <numpy array>
-            ``arr``: Array of numeric values.
+            ``columns``: Sorted column indices from ``_validation_columns()``.
             
         RETURNS
         -------
-        <numeric value>
-            Inverted value. 
+        <tuple>
+            Scaled train and test data as numpy arrays, holding only 
+            ``columns``.
         """
-        return np.abs(np.sum(np.sign(arr))) / len(arr)
+        train_data = self._get_data(columns=columns, dense=True)
+        test_data = self._test_data_columns(test_data, columns)
+        if self._scale == True:
+            sc = self._fit_scaler(train_data)
+            train_data = sc.transform(train_data)
+            test_data = sc.transform(np.array(test_data, dtype=float))
+        return train_data, test_data
 
-    def _min_max(self, arr):
+    def _test_data_columns(self, test_data, columns):
         """
-        Min-max standardization. 
+        Columns of the test data in the feature space RENT was trained on.
+        Feature clusters are collapsed first. If ``poly`` is not ``'OFF'``, 
+        only the requested polynomial features are computed from the test 
+        data. They are cached, such that repeated validation studies on the 
+        same test data do not expand it again.
         
         PARAMETERS
         ----------
+        <numpy array> or <pandas dataframe>
+            ``test_data``: Test dataset without polynomial features.
         <numpy array>
-            ``arr``: Array of numeric values.
+            ``columns``: Column indices in the expanded feature space.
             
         RETURNS
         -------
         <numpy array>
-            1-d array or matrix of higher dimension.
+            Test data matrix holding only ``columns``.
         """
-        return (arr-np.nanmin(arr)) / (np.nanmax(arr)-np.nanmin(arr))
+        if isinstance(test_data, (str, os.PathLike)):
+            test_data = np.load(test_data, mmap_mode='r')
+        if sparse.issparse(test_data):
+            if self._poly == 'OFF' and self._clusters is None:
+                return test_data.tocsc()[:, columns].toarray()
+            test_data = test_data.toarray()
+
+        if self._poly == 'OFF':
+            if self._clusters is not None:
+                return self._clusters.transform(test_data, columns)
+            return np.asarray(test_data)[:, columns]
+
+        test_data = np.asarray(test_data, dtype=float)
+        if self._clusters is not None:
+            test_data = self._clusters.transform(test_data)
+        key = hash_object(test_data)
+        if self._test_data_cache is None or self._test_data_cache[0] != key:
+            self._test_data_cache = (key, {})
+        cache = self._test_data_cache[1]
+
+        missing = [c for c in columns if c not in cache]
+        if len(missing) > 0:
+            expanded = self._data.get(columns=missing, data=test_data)
+            for position, c in enumerate(missing):
+                cache[c] = expanded[:, position]
+        if len(columns) == 0:
+            return np.empty((test_data.shape[0], 0))
+        return np.column_stack([cache[c] for c in columns])
+
+    def _draw_validation_columns(self, K):
+        """
+        Randomly draw as many features as RENT selected (VS1). 
+        Each drawing has its own seed, such that drawings are reproducible
+        independent of the order in which they are computed.
+        
+        PARAMETERS
+        ----------
+        <int>
+            ``K``: Number of the drawing, used as seed.
+            
+        RETURNS
+        -------
+        <numpy array>
+            Column indices of the drawn features.
+        """
+        return np.random.RandomState(seed=K).choice(
+            range(self._data.shape[1]), len(self._sel_var))
+
+    def _permuted_labels(self, test_labels, num_permutations):
+        """
+        Permuted test labels for VS2. Row K holds the labels permuted with
+        seed K, identical to ``np.random.RandomState(seed=K).permutation``.
+        
+        PARAMETERS
+        ----------
+        <numpy array> or <pandas dataframe>
+            ``test_labels``: Response variable of the test data.
+        <int>
+            ``num_permutations``: Number of permutations.
+            
+        RETURNS
+        -------
+        <numpy array>
+            Matrix of shape (``num_permutations``, number of test objects).
+        """
+        test_labels = np.asarray(test_labels).ravel()
+        permutations = np.empty((num_permutations, len(test_labels)),
+                                dtype=np.intp)
+        for K in range(num_permutations):
+            permutations[K, :] = np.random.RandomState(seed=K).permutation(
+                len(test_labels))
+        return test_labels[permutations]
 
 
 class RENT_Classification(RENT_Base):
@@ -1036,7 +2969,10 @@ class RENT_Classification(RENT_Base):
             - ``poly='OFF'`` : no feature interaction.
             - ``poly='ON'`` : feature interaction and squared features (2-polynoms).
             - ``poly='ON_only_interactions'`` : only feature interactions, \
-                no squared features.               
+                no squared features.
+            - ``poly='hierarchical'`` : squares and interactions only among \
+                features passing ``poly_tau_cutoffs`` in a first RENT round \
+                on the base features.
     testsize_range : <tuple float>
             Inside RENT, ``K`` models are trained, where the testsize defines the \
                 proportion of train data used for testing of a single model. The testsize 
@@ -1054,6 +2990,10 @@ class RENT_Classification(RENT_Base):
     classifier : <str>
         Classifier with witch models are trained.
             - ``classifier='logreg'`` : Logistic Regression            
+            - ``classifier='enet_cd'`` : Logistic Regression with the \
+                same objective, fitted by coordinate descent with \
+                strong-rule screening. Faster for many features and \
+                sparse models.
     K : <int>
         Number of unique train-test splits. Default: ``K=100``.        
     scale : <boolean>
@@ -1067,6 +3007,90 @@ class RENT_Classification(RENT_Base):
     verbose : <int>
         Track the train process if value > 1. If ``verbose = 1``, only the overview
         of RENT input will be shown. Default: ``verbose=0``.
+    poly_tau_cutoffs : <tuple float>
+        Cutoffs for tau_1, tau_2 and tau_3 in the first stage of \
+            ``poly='hierarchical'``. Default: ``poly_tau_cutoffs=(0.5, 0.5, 0.5)``.
+    screening : <None or str>
+        Univariate screening of features before the ensemble. \
+            Default: ``screening=None``.
+            - ``screening=None`` : no screening.
+            - ``screening='correlation'`` : absolute Pearson correlation.
+            - ``screening='t'`` : absolute Welch t-statistic between the classes.
+            - ``screening='logistic'`` : score statistic of a univariate \
+                logistic regression.
+    screening_size : <None or int>
+        Number of features kept by the screening. \
+            Default: ``screening_size=None``, i.e. n / log(n) features.
+    screening_per_split : <boolean>
+        Screen features on the train data of each model and CV fold instead \
+            of once. Default: ``screening_per_split=False``.
+    coarse_pass : <None, True or dict>
+        Train a fast coarse ensemble first and pass only features with \
+            tau_1 above a low cutoff to the full ensemble. \
+            Default: ``coarse_pass=None``.
+    subspace : <None, float or int>
+        Fraction (float) or number (int) of features randomly drawn for \
+            each model. The selection criteria are normalized by how often \
+            each feature was eligible. Default: ``subspace=None``.
+    train_size : <None or int>
+        Maximum number of train objects of each model. \
+            Default: ``train_size=None``.
+    test_size : <None or int>
+        Maximum number of test objects of each model. \
+            Default: ``test_size=None``.
+    cluster_threshold : <None or float>
+        Merge features whose absolute correlation exceeds this value into \
+            clusters before the ensemble. Default: ``cluster_threshold=None``.
+    cluster_mode : <str>
+        Represent a cluster by its first feature (``'representative'``) or \
+            by the mean of its standardized members (``'mean'``). \
+            Default: ``cluster_mode='representative'``.
+    dtype : <numpy dtype>
+        ``np.float32`` keeps data, scaled splits and stored results in \
+            single precision. Default: ``dtype=np.float64``.
+    data_order : <None or str>
+        Memory layout of the stored data array, ``'C'``, ``'F'`` or \
+            ``None`` to keep the layout of the input. \
+            Default: ``data_order=None``.
+    successive_halving : <None, True or dict>
+        Successive halving over the combinations of ``C`` and \
+            ``l1_ratios``: start with ``min_K`` models, keep the best \
+            ``1 / factor`` of the combinations and multiply their models \
+            by ``factor`` until ``K`` is reached. \
+            Default: ``successive_halving=None``.
+    model_based_search : <None, True or dict>
+        Search ``C`` (log scale) and ``l1_ratio`` continuously between the \
+            smallest and largest given values with a Gaussian process \
+            instead of the grid. Default: ``model_based_search=None``.
+    warm_start : <bool>
+        Start the ``K`` models of each combination from the coefficients \
+            of a pilot model fitted on all objects. \
+            Default: ``warm_start=False``.
+    solver_policy : <None, str or list>
+        Choice of the solver of the ``K`` models per combination of ``C`` \
+            and ``l1_ratios``. The choices are stored, see \
+            ``get_solver_choices()``. Default: ``solver_policy=None``.
+            - ``solver_policy=None`` : the solver of ``classifier``.
+            - ``solver_policy='auto'`` : the decision table \
+                ``_solver_table``: ``'lbfgs'`` for ``l1_ratio=0``, \
+                ``'liblinear'`` for ``l1_ratio=1`` and at least as many \
+                train objects as features, ``'enet_cd'`` for fewer train \
+                objects than features and ``'saga'`` otherwise. Train \
+                objects are those of a split with the mean of \
+                ``testsize_range``, at most ``train_size``. All solvers \
+                minimize the same objective. Tolerances of the table are \
+                scaled with the solver tolerance in use, e.g. in the coarse \
+                pass. On the standardized example data and for ``C`` \
+                between 0.1 and 10, the largest coefficient error of \
+                ``'lbfgs'`` and ``'liblinear'`` is below 2e-2 times the \
+                largest coefficient, measured against a solution with \
+                ``tol=1e-12``. The reference is this exact solution and \
+                not the ``'saga'`` solution of ``solver_policy=None``, \
+                since ``'saga'`` with the default tolerance itself \
+                deviates by up to 0.8 times the largest coefficient for \
+                weak l1 penalties.
+            - ``solver_policy=<list>`` : own decision table, in the \
+                format of ``_solver_table``.
         
     RETURNS
     ------
@@ -1078,23 +3102,57 @@ class RENT_Classification(RENT_Base):
                "_verbose", "_summary_df", "_score_dict", "_BIC_df", "_best_C",
                "_best_l1_ratio", "_indices", "_runtime", "_scores_df", "_combination", 
                "_zeros", "_perc", "_self_var", "_scores_df_cv", "_zeros_df_cv",
-               "_combination_cv", "_scoring","_classifier", "_predictions_dict","_probas",
-               "_pred_proba_dict", "_random_testsizes", "_weight_dict", "_weight_list", "_score_list"]
+               "_combination_cv", "_scoring","_classifier", "_predictions_dict",
+               "_pred_proba_dict", "_random_testsizes", "_weight_dict", "_score_list",
+               "_solver_policy", "_solver_choices"]
+
+    # Decision table of solver_policy='auto'. The first rule whose 
+    # conditions hold chooses the solver of a (C, l1) combination. 
+    # Conditions: 'l1_ratio' in [low, high], train objects per feature 
+    # 'n_per_p' in [low, high) and whether the data is 'sparse'. Missing conditions
+    # always hold. 'tol' (relative to the default tolerance), 'max_iter' 
+    # and 'intercept_scaling' (liblinear) replace the default settings of 
+    # the solver.
+    _solver_table = [
+        {'l1_ratio': (0, 0), 'solver': 'lbfgs', 'tol': 1e-6},
+        {'l1_ratio': (1, 1), 'n_per_p': (1, np.inf), 'solver': 'liblinear',
+         'tol': 1e-6, 'intercept_scaling': 100},
+        {'n_per_p': (0, 1), 'solver': 'enet_cd'},
+        {'solver': 'saga'}]
 
     def __init__(self, data, target, feat_names=[], C=[1,10], l1_ratios = [0.6],
                  autoEnetParSel=True, BIC=False, poly='OFF',
                  testsize_range=(0.2, 0.6), scoring='accuracy',
                  classifier='logreg', K=100, scale = True, random_state = None, 
-                 verbose = 0):
+                 verbose = 0, poly_tau_cutoffs=(0.5, 0.5, 0.5), screening=None,
+                 screening_size=None, screening_per_split=False, 
+                 coarse_pass=None, subspace=None, train_size=None,
+                 test_size=None, cluster_threshold=None,
+                 cluster_mode='representative', dtype=np.float64,
+                 data_order=None, successive_halving=None, 
+                 model_based_search=None, warm_start=False, 
+                 solver_policy=None):
 
         super().__init__(data, target, feat_names, C, l1_ratios, 
                          autoEnetParSel, BIC, poly, testsize_range, K, scale, 
-                         random_state, verbose)
+                         random_state, verbose, poly_tau_cutoffs, screening,
+                         screening_size, screening_per_split, coarse_pass,
+                         subspace, train_size, test_size, cluster_threshold,
+                         cluster_mode, dtype, data_order, successive_halving,
+                         model_based_search, warm_start)
         
         if scoring not in ['accuracy', 'f1', 'mcc']:
             sys.exit('Invalid scoring!')
-        if classifier not in ['logreg', 'linSVC']:
+        if classifier not in ['logreg', 'linSVC', 'enet_cd']:
             sys.exit('Invalid classifier')
+        if solver_policy == 'auto':
+            solver_policy = self._solver_table
+        if solver_policy is not None:
+            if not isinstance(solver_policy, list) or any(
+                    rule.get('solver') not in ['saga', 'lbfgs', 'newton-cg',
+                                               'liblinear', 'enet_cd']
+                    for rule in solver_policy):
+                sys.exit('Invalid solver_policy!')
 
         if verbose == 1:
             print('classifier:', classifier)
@@ -1104,6 +3162,220 @@ class RENT_Classification(RENT_Base):
         # Define all objects needed later in methods below
         self._scoring = scoring
         self._classifier = classifier
+        self._solver_policy = solver_policy
+        self._solver_choices = {}
+
+    def _marginal_statistic(self, X, y):
+        """
+        Marginal association between each feature and the binary target, 
+        used for screening.
+        
+        PARAMETERS
+        ----------
+        X: <numpy array>
+            Block of features.
+        y: <numpy array>
+            Target.
+            
+        RETURNS
+        -------
+        <numpy array>
+            Statistic for each column of ``X``. Higher values indicate 
+            stronger association.
+        """
+        # Labels are encoded as 0 and 1, which the score statistic assumes
+        y = (y == np.unique(self._target)[-1]).astype(float)
+        if self._screening == 't':
+            # Welch's t-statistic between the two classes
+            X_0 = X[y == 0, :]
+            X_1 = X[y == 1, :]
+            return np.abs(X_1.mean(axis=0) - X_0.mean(axis=0)) / np.sqrt(
+                X_1.var(axis=0, ddof=1) / X_1.shape[0] + 
+                X_0.var(axis=0, ddof=1) / X_0.shape[0])
+
+        X_centered = X - X.mean(axis=0)
+        y_centered = y - y.mean()
+        cov = X_centered.T @ y_centered
+        ss = np.sum(X_centered ** 2, axis=0)
+        if self._screening == 'correlation':
+            return np.abs(cov) / np.sqrt(ss * (y_centered @ y_centered))
+        # Score test of a univariate logistic regression at weight 0
+        return cov ** 2 / (y.mean() * (1 - y.mean()) * ss)
+
+    def _cv_splitter(self, n_splits=5):
+        """
+        Cross-validation folds of the hyperparameter search.
+        """
+        return StratifiedKFold(n_splits=n_splits, 
+                               random_state=self._random_state, shuffle=True)
+
+    def _strata(self):
+        """
+        Labels by which random subsets of all objects are stratified.
+        """
+        return np.asarray(self._target)
+
+    def _choose_solver(self, l1):
+        """
+        First rule of ``solver_policy`` whose conditions hold for the l1 
+        ratio ``l1`` and the data.
+        
+        RETURNS
+        -------
+        <dict>
+            Rule with the solver and its settings.
+        """
+        # Train objects of a split with the mean test size, at most 
+        # train_size. One value for all splits keeps one solver per 
+        # combination.
+        n_train = self._data.shape[0] * (1 - np.mean(self._testsize_range))
+        if self._train_size is not None:
+            n_train = min(n_train, self._train_size)
+        n_per_p = n_train / max(len(self._active_features), 1)
+        for rule in self._solver_policy:
+            low, high = rule.get('l1_ratio', (0, 1))
+            if not low <= l1 <= high:
+                continue
+            low, high = rule.get('n_per_p', (0, np.inf))
+            if not low <= n_per_p < high:
+                continue
+            if 'sparse' in rule and \
+                    rule['sparse'] != sparse.issparse(self._data):
+                continue
+            return rule
+        return {'solver': 'saga'}
+
+    def _elementary_model(self, C, l1, columns=None):
+        """
+        Unfitted logistic regression model for one train-test split. The 
+        solver is ``saga`` or, if ``classifier='enet_cd'``, 
+        ``_EnetLogistic``, unless ``solver_policy`` chooses another one.
+        
+        PARAMETERS
+        ----------
+        C: <float>
+            Regularization parameter.
+        l1: <float>
+            l1 ratio.
+        columns: <numpy array>
+            Column positions the model is trained on. If given and 
+            ``warm_start=True``, the model starts from the coefficients of 
+            the pilot model. Default: ``None``.
+        """
+        if self._solver_policy is None:
+            rule = {'solver': 'enet_cd' if self._classifier == 'enet_cd' 
+                    else 'saga'}
+        else:
+            rule = self._choose_solver(l1)
+        solver = rule['solver']
+        max_iter = rule.get('max_iter', self._max_iter)
+        # Tolerances of the table refer to the default tolerance. They are
+        # scaled with the tolerance in use, such that e.g. the coarse pass 
+        # loosens all solvers alike.
+        tol = rule.get('tol', self._default_tol) * \
+            self._tol / self._default_tol
+        if self._solver_choices.get((C, l1)) != solver:
+            self._solver_choices[(C, l1)] = solver
+            if self._verbose > 0 and self._solver_policy is not None:
+                print('C = ', C, 'l1 = ', l1, 'solver: ', solver)
+
+        if solver == 'enet_cd':
+            model = _EnetLogistic(C=C, l1_ratio=l1, max_iter=max_iter, 
+                                  tol=tol)
+        elif solver == 'saga':
+            model = LogisticRegression(solver='saga',
+                                       C=C,
+                                       penalty='elasticnet',
+                                       l1_ratio=l1,
+                                       n_jobs=-1,
+                                       max_iter=max_iter,
+                                       tol=tol,
+                                       random_state=self._random_state)
+        elif solver in ['lbfgs', 'newton-cg']:
+            if l1 != 0:
+                sys.exit(solver + ' can only be used for l1_ratio=0!')
+            model = LogisticRegression(solver=solver, C=C, penalty='l2',
+                                       max_iter=max_iter, tol=tol)
+        else:
+            if l1 not in [0, 1]:
+                sys.exit('liblinear can only be used for l1_ratio 0 or 1!')
+            # liblinear penalizes the intercept, which becomes negligible
+            # for a large intercept_scaling
+            model = LogisticRegression(
+                solver='liblinear', C=C, penalty='l1' if l1 == 1 else 'l2',
+                max_iter=max_iter, tol=tol, 
+                intercept_scaling=rule.get('intercept_scaling', 1),
+                random_state=self._random_state)
+        if columns is not None and (C, l1) in self._pilot_coef:
+            coef, intercept = self._pilot_coef[(C, l1)]
+            model.warm_start = True
+            model.coef_ = coef[columns][np.newaxis, :]
+            model.intercept_ = np.array(intercept)
+        return model
+
+    def _cv_evaluate(self, C, l1, cv):
+        """
+        Cross-validated performance of one hyperparameter combination. In 
+        each fold, the features selected by the elastic net are refitted 
+        without penalty and scored on the test fold.
+        
+        PARAMETERS
+        ----------
+        C: <float>
+            Regularization parameter.
+        l1: <float>
+            l1 ratio.
+        cv: <cross-validation splitter>
+            Folds, see ``_cv_splitter()``.
+            
+        RETURNS
+        -------
+        <tuple>
+            - First entry: average MCC over the folds.
+            - Second entry: average percentage of zero weights.
+            Both are ``NaN`` if no feature was selected in any fold.
+        """
+        scores = []
+        zeros = []
+        target = np.asarray(self._target)
+        for fold, (train, test) in enumerate(
+                cv.split(np.zeros(self._data.shape[0]), self._target)):
+            # Folds are capped like the train-test splits of the models
+            train = self._cap_rows(train, self._train_size, fold,
+                                   stratify=target[train])
+            test = self._cap_rows(test, self._test_size, fold,
+                                  stratify=target[test])
+            train_data, test_data_split = self._split_data(
+                train, test, self._split_columns(train))
+            train_target = self._target[train]
+            test_target = self._target[test]
+
+            sgd = LogisticRegression(penalty="elasticnet", C=C,
+                                     solver="saga", l1_ratio=l1,
+                                     random_state=self._random_state)
+
+            sgd.fit(train_data, train_target)
+
+            params = np.where(sgd.coef_ != 0)[1]
+            if len(params) == 0:
+                scores.append(np.nan)
+                zeros.append(np.nan)
+            else:
+                zeros.append((train_data.shape[1]-len(params))\
+                              /train_data.shape[1])
+
+                train_data_1 = train_data[:,params]
+                test_data_1 = test_data_split[:, params]
+
+                model = LogisticRegression(penalty='none',
+                                           max_iter=8000,
+                                           solver="saga",
+                                           random_state=self._random_state).\
+                        fit(train_data_1, train_target)
+                scores.append(matthews_corrcoef(test_target, \
+                                model.predict(test_data_1)))
+
+        return np.nanmean(scores), np.nanmean(zeros)
 
     def _par_selection(self,
                         C,
@@ -1136,8 +3408,7 @@ class RENT_Classification(RENT_Base):
             - Second entry: suggested `l1 ratio`.            
         """
         
-        skf = StratifiedKFold(n_splits=n_splits, random_state=self._random_state,\
-                              shuffle=True)
+        skf = self._cv_splitter(n_splits)
         scores_df = pd.DataFrame(np.zeros, index=l1_ratios, columns=C)
         zeros_df = pd.DataFrame(np.zeros, index=l1_ratios, columns=C)
         
@@ -1150,56 +3421,15 @@ class RENT_Classification(RENT_Base):
             l1: current l1 ratio in the parallelization framework.
             """
             for reg in C:
-                scores = []
-                zeros = []
-                for train, test in skf.split(self._data, self._target):
-                    if self._scale == True:
-                        sc = StandardScaler()
-                        train_data = sc.fit_transform(self._data.iloc[train, :])
-                        train_target = self._target[train]
-                        test_data_split = sc.transform(self._data.iloc[test, :])
-                        test_target = self._target[test]
-                    elif self._scale == False:
-                        train_data = self._data.iloc[train, :].values
-                        train_target = self._target[train]
-                        test_data_split = self._data.iloc[test, :].values
-                        test_target = self._target[test]
-
-                    sgd = LogisticRegression(penalty="elasticnet", C=reg,
-                                             solver="saga", l1_ratio=l1,
-                                             random_state=self._random_state)
-
-                    sgd.fit(train_data, train_target)
-
-                    params = np.where(sgd.coef_ != 0)[1]
-                    if len(params) == 0:
-                        scores.append(np.nan)
-                        zeros.append(np.nan)
-                    else:
-                        zeros.append((len(self._data.columns)-len(params))\
-                                      /len(self._data.columns))
-
-                        train_data_1 = train_data[:,params]
-                        test_data_1 = test_data_split[:, params]
-
-                        model = LogisticRegression(penalty='none',
-                                                   max_iter=8000,
-                                                   solver="saga",
-                                                   random_state=self._random_state).\
-                                fit(train_data_1, train_target)
-                        scores.append(matthews_corrcoef(test_target, \
-                                        model.predict(test_data_1)))
-
-                scores_df.loc[l1, reg] = np.nanmean(scores)
-                zeros_df.loc[l1, reg] = np.nanmean(zeros)
+                scores_df.loc[l1, reg], zeros_df.loc[l1, reg] = \
+                    self._cv_evaluate(reg, l1, skf)
 
         self._scores_df_cv = scores_df
         self._zeros_df_cv = zeros_df
         self._scores_df_cv.columns.name = 'Scores'
         self._zeros_df_cv.columns.name = 'Zeros'
 
-        Parallel(n_jobs=-1, verbose=1, backend="threading")(
-             map(delayed(run_parallel), l1_ratios))
+        self._parallel(run_parallel, l1_ratios, verbose=1)
 
         
         if len(np.unique(scores_df.stack()))==1:
@@ -1252,6 +3482,14 @@ class RENT_Classification(RENT_Base):
         """
         # self._AIC_df = pd.DataFrame(np.zeros, index=l1_ratios, columns=C) 
         self._BIC_df = pd.DataFrame(np.zeros, index=l1_ratios, columns=C) 
+        # One block for all models, capped like the train objects of the
+        # models
+        target = np.asarray(self._target)
+        rows = self._cap_rows(np.arange(self._data.shape[0]), 
+                              self._train_size, 0, stratify=target)
+        train_data = self._split_data(rows)[0]
+        train_target = target[rows]
+
         def run_parallel(l1):
             """
             Parallel computation of for ``K`` * ``C`` * ``l1_ratios`` models.
@@ -1260,16 +3498,6 @@ class RENT_Classification(RENT_Base):
             l1: current l1 ratio in the parallelization framework.
             """
             for reg in C:
-                if self._scale == True:
-                    sc = StandardScaler()
-                    train_data = sc.fit_transform(self._data)
-                    train_target = self._target
-                    
-                elif self._scale == False:
-                    train_data = self._data.values
-                    train_target = self._target
-                    
-
                 sgd = LogisticRegression(penalty="elasticnet", C=reg,
                                             solver="saga", l1_ratio=l1,
                                             random_state=self._random_state)
@@ -1286,8 +3514,7 @@ class RENT_Classification(RENT_Base):
                 # self._AIC_df.loc[l1, reg] = AIC
                 self._BIC_df.loc[l1, reg] = BIC
                 
-        Parallel(n_jobs=-1, verbose=1, backend="threading")(
-             map(delayed(run_parallel), l1_ratios))
+        self._parallel(run_parallel, l1_ratios, verbose=1)
 
         
         best_combination_row, best_combination_col = np.where(self._BIC_df == \
@@ -1310,107 +3537,106 @@ class RENT_Classification(RENT_Base):
             Range of train-test splits. The parameter cannot be set directly \
                 by the user but is used for an internal parallelization.
         """
-        # Loop through all C
-        for C in self._C:
-            for l1 in self._l1_ratios:
-                
-                if self._random_state is None:
-                    X_train, X_test, y_train, y_test = train_test_split(
-                          self._data, self._target,
-                          test_size=self._random_testsizes[K],
-                          stratify=self._target, random_state=None)
-                else:
-                    X_train, X_test, y_train, y_test = train_test_split(
-                          self._data, self._target,
-                          test_size=self._random_testsizes[K],
-                          stratify=self._target, random_state=K)
-
-                self._X_test = X_test
-
-                if self._scale == True:
-                    sc = StandardScaler()
-                    sc.fit(X_train)
-                    X_train_std = sc.transform(X_train)
-                    X_test_std = sc.transform(X_test)
-                elif self._scale == False:
-                    X_train_std = X_train.copy().values
-                    X_test_std = X_test.copy().values
-
-                if self._verbose > 1:
-                    print('C = ', C, 'l1 = ', l1, ', TT split = ', K)
-
-                if self._classifier == 'logreg':
-                    # Trian a logistic regreission model
-                    model = LogisticRegression(solver='saga',
-                                            C=C,
-                                            penalty='elasticnet',
-                                            l1_ratio=l1,
-                                            n_jobs=-1,
-                                            max_iter=5000,
-                                            random_state=self._random_state).\
-                                            fit(X_train_std, y_train)
-                else:
-                    sys.exit('No valid classifier.')
-
-                # Get all weights (coefficients). Those that were selected
-                # are non-zero, otherwise zero
-                #print(logreg.coef_)
-                self._weight_dict[(C, l1, K)] = model.coef_
-                self._weight_list.append(model.coef_)
-
-                if self._scoring == 'accuracy':
-                    y_test_pred = model.predict(X_test_std)
-                    score = model.score(X_test_std, y_test)
-                elif self._scoring == 'f1':
-                    y_test_pred = model.predict(X_test_std)
-                    score = f1_score(y_test, y_test_pred)
-                elif self._scoring == 'precision':
-                    y_test_pred = model.predict(X_test_std)
-                    score = precision_score(y_test, y_test_pred)
-                elif self._scoring == 'recall':
-                    y_test_pred = model.predict(X_test_std)
-                    score = recall_score(y_test, y_test_pred)
-                elif self._scoring == 'mcc':
-                    y_test_pred = model.predict(X_test_std)
-                    score = matthews_corrcoef(y_test, y_test_pred)
-
-                #check if we need score_all and score_dict
-                self._score_dict[(C, l1, K)] = score
-                self._score_list.append(score)
-
-                # Collect true values and predictions in dictionary
-                predictions = pd.DataFrame({'y_test':y_test, \
-                                       'y_pred': y_test_pred})
-                predictions.index = X_test.index
-
-                # calculate predict_proba for current train/test and weight
-                # initialization
-                self._predictions_dict[(C, l1, K)] = predictions
-                if(self._classifier == 'logreg'):
-                    self._probas[(C, l1, K)] = pd.DataFrame( \
-                           model.predict_proba(X_test_std), index = \
-                                X_test.index)
-    def train(self):
+        # Loop through the (C, l1) combinations that are trained
+        for C, l1 in self._cells:
+            tic = self._timer.tic()
+            
+            # Split row positions, such that the test objects can be
+            # written directly into the object probability matrix
+            if self._random_state is None:
+                train_ind, test_ind = train_test_split(
+                      np.arange(self._data.shape[0]),
+                      test_size=self._random_testsizes[K],
+                      stratify=self._target, random_state=None)
+            else:
+                train_ind, test_ind = train_test_split(
+                      np.arange(self._data.shape[0]),
+                      test_size=self._random_testsizes[K],
+                      stratify=self._target, random_state=K)
+            target = np.asarray(self._target)
+            train_ind = self._cap_rows(train_ind, self._train_size, K,
+                                       stratify=target[train_ind])
+            test_ind = self._cap_rows(test_ind, self._test_size, K,
+                                      stratify=target[test_ind])
+
+            columns = self._split_columns(train_ind)
+            if self._subspace is not None:
+                columns = self._draw_subspace(columns, K, C, l1)
+            tic = self._timer.toc('split', tic)
+            X_train_std, X_test_std = self._split_data(train_ind, test_ind,
+                                                       columns)
+            y_train = np.asarray(self._target)[train_ind]
+            y_test = np.asarray(self._target)[test_ind]
+            tic = self._timer.toc('scaling', tic)
+
+            if self._verbose > 1:
+                print('C = ', C, 'l1 = ', l1, ', TT split = ', K)
+
+            if self._classifier in ['logreg', 'enet_cd']:
+                # Trian a logistic regreission model
+                start = time.time()
+                model = self._elementary_model(C, l1, columns).\
+                                        fit(X_train_std, y_train)
+                self._record_fit(C, l1, K, model, time.time() - start)
+                tic = self._timer.toc('fit', tic)
+            else:
+                sys.exit('No valid classifier.')
+
+            # Get all weights (coefficients). Those that were selected
+            # are non-zero, otherwise zero
+            #print(logreg.coef_)
+            self._weight_dict[(C, l1)][K, columns] = model.coef_.ravel()
+
+            if self._scoring == 'accuracy':
+                y_test_pred = model.predict(X_test_std)
+                score = model.score(X_test_std, y_test)
+            elif self._scoring == 'f1':
+                y_test_pred = model.predict(X_test_std)
+                score = f1_score(y_test, y_test_pred)
+            elif self._scoring == 'precision':
+                y_test_pred = model.predict(X_test_std)
+                score = precision_score(y_test, y_test_pred)
+            elif self._scoring == 'recall':
+                y_test_pred = model.predict(X_test_std)
+                score = recall_score(y_test, y_test_pred)
+            elif self._scoring == 'mcc':
+                y_test_pred = model.predict(X_test_std)
+                score = matthews_corrcoef(y_test, y_test_pred)
+            tic = self._timer.toc('score', tic)
+
+            #check if we need score_all and score_dict
+            self._score_dict[(C, l1, K)] = score
+            self._score_list.append(score)
+
+            # Collect true values and predictions in dictionary
+            predictions = pd.DataFrame({'y_test':y_test, \
+                                   'y_pred': y_test_pred})
+            predictions.index = self._indices[test_ind]
+
+            # calculate predict_proba for current train/test and weight
+            # initialization
+            self._predictions_dict[(C, l1, K)] = predictions
+            if self._classifier in ['logreg', 'enet_cd']:
+                # Each model owns column K, hence no locking is needed
+                self._pred_proba_dict[(C, l1)][test_ind, K] = \
+                    model.predict_proba(X_test_std)[:, 1]
+            self._timer.toc('merge', tic)
+
+    def _init_ensemble_results(self):
+        """
+        Initialize the containers filled by ``run_parallel()``.
+        """
         self._predictions_dict = {}
-        self._probas = {}
-        self._pred_proba_dict = {}
-        super().train()
+        self._solver_choices = {}
 
-        # Build a dictionary with the prediction probabilities
-        for C in self._C:
-            for l1 in self._l1_ratios:
-                count =  0
-                vec = pd.DataFrame(np.nan, index= self._indices, \
-                                columns = ['remove'])
-                for k in self._probas:
-
-                    if k[0] == C and k[1] == l1:
-                        vec.loc[self._probas[k].index,count] = \
-                        self._probas[k].iloc[:, 1].values
-                        count += 1
-                vec = vec.iloc[:, 1:]
-                self._pred_proba_dict[(C, l1)] = vec
+        # Preallocate one object x model probability matrix per (C, l1).
+        # Entries stay NaN where the object was not part of the test set.
+        self._pred_proba_dict = {
+            (C, l1): np.full((self._data.shape[0], self._K), np.nan, 
+                             dtype=self._dtype)
+            for C in self._C for l1 in self._l1_ratios}
 
+    @_timed('summaries')
     def get_summary_objects(self):
         """
         Each object of the dataset is a certain number between 
@@ -1444,15 +3670,16 @@ class RENT_Classification(RENT_Base):
             for K in range(self._K)
         ]
 
-        for specific_prediction in specific_predictions:
-            for count, tup in enumerate(zip(specific_prediction.y_test, specific_prediction.y_pred)):
-                ind = specific_prediction.index[count]
-
-                # Upgrade ind by one if used as test object
-                self._incorrect_labels.loc[ind,'# test'] += 1
-                if tup[0] != tup[1]:
-                    # Upgrade number of incorrectly classified
-                    self._incorrect_labels.loc[ind,'# incorrect'] += 1
+        # Count tests and misclassifications per object in one pass
+        positions = self._indices.get_indexer(np.concatenate(
+            [prediction.index for prediction in specific_predictions]))
+        incorrect = np.concatenate(
+            [prediction.y_test.values != prediction.y_pred.values
+             for prediction in specific_predictions])
+        n = len(self._indices)
+        self._incorrect_labels['# test'] = np.bincount(positions, minlength=n)
+        self._incorrect_labels['# incorrect'] = np.bincount(
+            positions, weights=incorrect, minlength=n).astype(np.int_)
 
         self._incorrect_labels['% incorrect'] = \
         (self._incorrect_labels["# incorrect"] \
@@ -1460,10 +3687,31 @@ class RENT_Classification(RENT_Base):
 
         return self._incorrect_labels
 
+    def get_solver_choices(self):
+        """
+        Solvers used for the combinations of ``C`` and ``l1_ratios`` in the 
+        last training, see ``solver_policy``.
+        
+        RETURNS
+        -------
+        <pandas dataframe>
+            Solver names. Rows represent ``l1_ratios``, columns ``C``. 
+            Combinations without trained models are ``NaN``.
+        """
+        if not hasattr(self, '_best_C'):
+            sys.exit('Run train() first!')
+        choices = pd.DataFrame(index=self._l1_ratios, columns=self._C, 
+                               dtype=object)
+        for (C, l1), solver in self._solver_choices.items():
+            choices.loc[l1, C] = solver
+        choices.columns.name = 'Solver'
+        return choices
+
     def get_object_probabilities(self):
         """
         Logistic Regression probabilities for each combination of object and model. 
-        The method can only be used if ``classifier='logreg'``.
+        The method can only be used if ``classifier='logreg'`` or 
+        ``classifier='enet_cd'``.
         
         RETURNS
         -------
@@ -1477,14 +3725,14 @@ class RENT_Classification(RENT_Base):
         if not hasattr(self, '_pred_proba_dict'):
             sys.exit('Run train() first!')
 
-        if self._classifier != 'logreg':
-            return warnings.warn('Classifier must be "logreg"!')
-        self._pp_data = self._pred_proba_dict[
-            (self._best_C, self._best_l1_ratio)].copy()
-
-        self._pp_data.columns = ['mod {0}'.format(x+1) \
-                                    for x in range(
-                                            self._pp_data.shape[1])]
+        if self._classifier not in ['logreg', 'enet_cd']:
+            return warnings.warn('Classifier must be "logreg" or "enet_cd"!')
+        # The dataframe is a view on the stored probability matrix
+        self._pp_data = pd.DataFrame(
+            self._pred_proba_dict[(self._best_C, self._best_l1_ratio)],
+            index=self._indices,
+            columns=['mod {0}'.format(x+1) for x in range(self._K)],
+            copy=False)
         return self._pp_data
 
     def plot_object_probabilities(self, object_id, binning='auto', lower=0,
@@ -1512,14 +3760,12 @@ class RENT_Classification(RENT_Base):
         if not hasattr(self, '_best_C'):
             sys.exit('Run train() first!')
 
-        target_objects = pd.DataFrame(self._target)
-        target_objects.index = self._pred_proba_dict[self._best_C, \
-                              self._best_l1_ratio].index
-        self._t = target_objects
+        object_probabilities = self.get_object_probabilities()
+        target_objects = pd.DataFrame(np.asarray(self._target),
+                                      index=object_probabilities.index)
         for obj in object_id:
             fig, ax = plt.subplots()
-            data = self._pred_proba_dict[self._best_C, \
-                              self._best_l1_ratio].loc[obj,:].dropna()
+            data = object_probabilities.loc[obj,:].dropna()
 
             if binning == "auto":
                 bins = None
@@ -1551,18 +3797,20 @@ class RENT_Classification(RENT_Base):
                 
                 
 
+    @_timed('validation')
     def _prepare_validation_study(self, test_data, test_labels, num_drawings, 
                                   num_permutations, metric='mcc', alpha=0.05):
 
+        # Scale once, all feature subsets below are slices of these arrays
+        drawings, columns = self._validation_columns(num_drawings)
+        train_scaled, test_scaled = self._scale_validation_data(test_data,
+                                                                columns)
+        sel_var = np.searchsorted(columns, self._sel_var)
+
         # RENT prediction
-        if self._scale == True:
-            sc = StandardScaler()
-            train_RENT = sc.fit_transform(self._data.iloc[:, self._sel_var])
-            test_RENT = sc.transform(test_data.iloc[:, self._sel_var])
-        elif self._scale == False:
-            train_RENT = self._data.iloc[:, self._sel_var].values
-            test_RENT = test_data.iloc[:, self._sel_var].values
-        if self._classifier == 'logreg':
+        train_RENT = train_scaled[:, sel_var]
+        test_RENT = test_scaled[:, sel_var]
+        if self._classifier in ['logreg', 'enet_cd']:
                     model = LogisticRegression(penalty='none', max_iter=8000,
                                                 solver="saga", \
                                                 random_state=self._random_state).\
@@ -1578,22 +3826,20 @@ class RENT_Classification(RENT_Base):
             score = accuracy_score(test_labels, model.predict(test_RENT))
 
         # VS1
-        VS1 = []
-        for K in range(num_drawings):
-            # Randomly select features (# features = # RENT features selected)
-            columns = np.random.RandomState(seed=K).choice(
-                range(len(self._data.columns)), len(self._sel_var)
-            )
-
-            if self._scale == True:
-                sc = StandardScaler()
-                train_VS1 = sc.fit_transform(self._data.iloc[:, columns])
-                test_VS1 = sc.transform(test_data.iloc[:, columns])
-            elif self._scale == False:
-                train_VS1 = self._data.iloc[:, columns].values
-                test_VS1 = test_data.iloc[:, columns].values
-
-            if self._classifier == 'logreg':
+        def run_drawing(K):
+            """
+            Score a model trained on one random feature drawing.
+            
+            PARAMETERS
+            -----
+            K: number of the drawing, used as seed.
+            """
+            # Randomly selected features (# features = # RENT features selected)
+            drawn = np.searchsorted(columns, drawings[K])
+            train_VS1 = train_scaled[:, drawn]
+            test_VS1 = test_scaled[:, drawn]
+
+            if self._classifier in ['logreg', 'enet_cd']:
                 model = LogisticRegression(penalty='none', max_iter=8000,
                                             solver="saga", 
                                             random_state=self._random_state).\
@@ -1601,49 +3847,43 @@ class RENT_Classification(RENT_Base):
             else:
                 print("something")
             if metric == 'mcc':
-                VS1.append(matthews_corrcoef(test_labels, \
-                                                    model.predict(test_VS1)))
+                return matthews_corrcoef(test_labels, model.predict(test_VS1))
             elif metric == 'f1':
-                VS1.append(f1_score(test_labels, \
-                                                    model.predict(test_VS1)))
+                return f1_score(test_labels, model.predict(test_VS1))
             elif metric == 'acc':
-                VS1.append(accuracy_score(test_labels, \
-                                                    model.predict(test_VS1)))
+                return accuracy_score(test_labels, model.predict(test_VS1))
 
-        # VS2
-        sc = StandardScaler()
-        test_data.columns = self._data.columns
-        VS2 = []
-        if self._scale == True:
-            train_VS2 = sc.fit_transform(self._data.iloc[:,self._sel_var])
-            test_VS2 = sc.transform(test_data.iloc[:, self._sel_var])
-        elif self._scale == False:
-            train_VS2 = self._data.iloc[:,self._sel_var].values
-            test_VS2 = test_data.iloc[:, self._sel_var].values
-
-        if self._classifier == 'logreg':
-            model = LogisticRegression(penalty='none', max_iter=8000,
-                                        solver="saga", 
-                                        random_state=self._random_state ).\
-                    fit(train_VS2, self._target)
-        else:
-            print("add model")
+        # Drawings are independent and dispatched in batches to the workers
+        VS1 = Parallel(n_jobs=-1, verbose=0, backend='threading',
+                       batch_size='auto')(
+             map(delayed(run_drawing), range(num_drawings)))
 
-        for K in range(num_permutations):
+        # VS2
+        # The predictions of the RENT model are fixed, only the labels are
+        # permuted. Confusion matrix counts of all permutations are computed
+        # at once. The positive class is the second class of the model, as 
+        # for sklearn's metrics with binary labels.
+        permuted = self._permuted_labels(test_labels, num_permutations)
+        pred_pos = model.predict(test_RENT) == model.classes_[1]
+        true_pos = permuted == model.classes_[1]
+
+        tp = np.sum(true_pos & pred_pos, axis=1).astype(float)
+        fp = np.sum(pred_pos) - tp
+        fn = np.sum(true_pos, axis=1) - tp
+        tn = permuted.shape[1] - tp - fp - fn
+
+        # Undefined scores are set to 0, as in sklearn
+        with np.errstate(divide='ignore', invalid='ignore'):
             if metric == 'mcc':
-                VS2.append(matthews_corrcoef(
-                        np.random.RandomState(seed=K).permutation(test_labels),\
-                        model.predict(test_VS2)))
+                VS2 = (tp * tn - fp * fn) / np.sqrt(
+                    (tp + fp) * (tp + fn) * (tn + fp) * (tn + fn))
             elif metric == 'f1':
-                VS2.append(f1_score(
-                        np.random.RandomState(seed=K).permutation(test_labels),\
-                        model.predict(test_VS2)))
+                VS2 = 2 * tp / (2 * tp + fp + fn)
             elif metric == 'acc':
-                VS2.append(accuracy_score(
-                        np.random.RandomState(seed=K).permutation(test_labels),\
-                        model.predict(test_VS2)))
+                VS2 = np.mean(permuted == model.predict(test_RENT), axis=1)
+        VS2 = np.nan_to_num(VS2, nan=0.0, posinf=0.0, neginf=0.0)
 
-        return score, VS1, VS2
+        return score, np.asarray(VS1), VS2
                     
                     
         
@@ -1654,9 +3894,11 @@ class RENT_Regression(RENT_Base):
     PARAMETERS
     ----------
     
-    data: <numpy array> or <pandas dataframe>
+    data: <numpy array>, <pandas dataframe>, <scipy sparse matrix> or <str>
         Dataset on which feature selection shall be performed. \
-            Variable types must be numeric or integer.            
+            Variable types must be numeric or integer. Sparse data is \
+            scaled without centering. A path to a ``.npy`` file or a \
+            ``np.memmap`` is read block by block from disk.
     target: <numpy array> or <pandas dataframe>
         Response variable of data.        
     feat_names : <list>
@@ -1685,7 +3927,10 @@ class RENT_Regression(RENT_Base):
             - ``poly='OFF'`` : no feature interaction.
             - ``poly='ON'`` : feature interaction and squared features (2-polynoms).
             - ``poly='ON_only_interactions'`` : only feature interactions, \
-                no squared features.                
+                no squared features.
+            - ``poly='hierarchical'`` : squares and interactions only among \
+                features passing ``poly_tau_cutoffs`` in a first RENT round \
+                on the base features.
     testsize_range : <tuple float>
          Inside RENT, ``K`` models are trained, where the testsize defines the \
              proportion of train data used for testing of a single model. The testsize 
@@ -1704,6 +3949,77 @@ class RENT_Regression(RENT_Base):
     verbose : <int>
         Track the train process if value > 1. If ``verbose = 1``, only the overview
         of RENT input will be shown. Default: ``verbose=0``.
+    poly_tau_cutoffs : <tuple float>
+        Cutoffs for tau_1, tau_2 and tau_3 in the first stage of \
+            ``poly='hierarchical'``. Default: ``poly_tau_cutoffs=(0.5, 0.5, 0.5)``.
+    screening : <None or str>
+        Univariate screening of features before the ensemble. \
+            Default: ``screening=None``.
+            - ``screening=None`` : no screening.
+            - ``screening='correlation'`` : absolute Pearson correlation.
+            - ``screening='t'`` : absolute t-statistic of a univariate \
+                linear regression.
+    screening_size : <None or int>
+        Number of features kept by the screening. \
+            Default: ``screening_size=None``, i.e. n / log(n) features.
+    screening_per_split : <boolean>
+        Screen features on the train data of each model and CV fold instead \
+            of once. Default: ``screening_per_split=False``.
+    coarse_pass : <None, True or dict>
+        Train a fast coarse ensemble first and pass only features with \
+            tau_1 above a low cutoff to the full ensemble. \
+            Default: ``coarse_pass=None``.
+    subspace : <None, float or int>
+        Fraction (float) or number (int) of features randomly drawn for \
+            each model. The selection criteria are normalized by how often \
+            each feature was eligible. Default: ``subspace=None``.
+    train_size : <None or int>
+        Maximum number of train objects of each model. \
+            Default: ``train_size=None``.
+    test_size : <None or int>
+        Maximum number of test objects of each model. \
+            Default: ``test_size=None``.
+    cluster_threshold : <None or float>
+        Merge features whose absolute correlation exceeds this value into \
+            clusters before the ensemble. Default: ``cluster_threshold=None``.
+    cluster_mode : <str>
+        Represent a cluster by its first feature (``'representative'``) or \
+            by the mean of its standardized members (``'mean'``). \
+            Default: ``cluster_mode='representative'``.
+    dtype : <numpy dtype>
+        ``np.float32`` keeps data, scaled splits and stored results in \
+            single precision. Default: ``dtype=np.float64``.
+    data_order : <None or str>
+        Memory layout of the stored data array, ``'C'``, ``'F'`` or \
+            ``None`` to keep the layout of the input. \
+            Default: ``data_order=None``.
+    successive_halving : <None, True or dict>
+        Successive halving over the combinations of ``C`` and \
+            ``l1_ratios``: start with ``min_K`` models, keep the best \
+            ``1 / factor`` of the combinations and multiply their models \
+            by ``factor`` until ``K`` is reached. \
+            Default: ``successive_halving=None``.
+    model_based_search : <None, True or dict>
+        Search ``C`` (log scale) and ``l1_ratio`` continuously between the \
+            smallest and largest given values with a Gaussian process \
+            instead of the grid. Default: ``model_based_search=None``.
+    warm_start : <bool>
+        Start the ``K`` models of each combination from the coefficients \
+            of a pilot model fitted on all objects. \
+            Default: ``warm_start=False``.
+    engine : <str>
+        How the models of a train-test split are computed. \
+            Default: ``engine='elementary'``.
+            - ``engine='elementary'`` : one ``ElasticNet`` fit per \
+                combination of ``C`` and ``l1_ratios``.
+            - ``engine='path'`` : one coordinate descent path over all \
+                ``C`` per value of ``l1_ratios``, where each split computes \
+                the Gram matrix of its train data once if the train data \
+                has more objects than features and at most \
+                ``_path_gram_limit`` features. The solutions agree with \
+                ``'elementary'`` within the solver tolerance. Sparse data \
+                and ``subspace`` use ``'elementary'``. ``warm_start`` \
+                only applies to ``'elementary'``.
         
     RETURNS
     ------
@@ -1715,19 +4031,172 @@ class RENT_Regression(RENT_Base):
                "_verbose", "_summary_df", "_score_dict", "_BIC_df", "_best_C",
                "_best_l1_ratio", "_indices", "_runtime", "_scores_df", "_combination", 
                "_zeros", "_perc", "_self_var", "_scores_df_cv", "_zeros_df_cv", "_combination_cv", 
-               "_predictions_abs_errors", "_random_testsizes", "_weight_dict", "_weight_list", 
-               "_score_list", "_histogram_data"]
+               "_predictions_abs_errors", "_random_testsizes", "_weight_dict",
+               "_score_list", "_histogram_data", "_engine"]
+
+    # Maximum number of features for which the path engine precomputes the 
+    # Gram matrix of a train split
+    _path_gram_limit = 5000
 
 
     def __init__(self, data, target, feat_names=[], 
                  C=[1,10], l1_ratios = [0.6], autoEnetParSel=True, BIC=False,
                  poly='OFF', testsize_range=(0.2, 0.6),
-                 K=100, scale=True, random_state = None, verbose = 0):
+                 K=100, scale=True, random_state = None, verbose = 0,
+                 poly_tau_cutoffs=(0.5, 0.5, 0.5), screening=None,
+                 screening_size=None, screening_per_split=False,
+                 coarse_pass=None, subspace=None, train_size=None,
+                 test_size=None, cluster_threshold=None,
+                 cluster_mode='representative', dtype=np.float64,
+                 data_order=None, successive_halving=None, 
+                 model_based_search=None, warm_start=False, 
+                 engine='elementary'):
 
 
         super().__init__(data, target, feat_names, C, l1_ratios, 
                          autoEnetParSel, BIC, poly, testsize_range, K, scale, 
-                         random_state, verbose)
+                         random_state, verbose, poly_tau_cutoffs, screening,
+                         screening_size, screening_per_split, coarse_pass,
+                         subspace, train_size, test_size, cluster_threshold,
+                         cluster_mode, dtype, data_order, successive_halving,
+                         model_based_search, warm_start)
+
+        if engine not in ['elementary', 'path']:
+            sys.exit('engine must be "elementary" or "path"!')
+        self._engine = engine
+
+    def _marginal_statistic(self, X, y):
+        """
+        Marginal association between each feature and the target, used 
+        for screening.
+        
+        PARAMETERS
+        ----------
+        X: <numpy array>
+            Block of features.
+        y: <numpy array>
+            Target.
+            
+        RETURNS
+        -------
+        <numpy array>
+            Statistic for each column of ``X``. Higher values indicate 
+            stronger association.
+        """
+        if self._screening == 'logistic':
+            sys.exit('screening="logistic" is only available for classification!')
+
+        y = np.asarray(y, dtype=float)
+        X_centered = X - X.mean(axis=0)
+        y_centered = y - y.mean()
+        corr = (X_centered.T @ y_centered) / np.sqrt(
+            np.sum(X_centered ** 2, axis=0) * (y_centered @ y_centered))
+        if self._screening == 'correlation':
+            return np.abs(corr)
+        # t-statistic of the slope of a univariate linear regression
+        return np.abs(corr) * np.sqrt((len(y) - 2) / (1 - corr ** 2))
+
+    def _cv_splitter(self, n_splits=5):
+        """
+        Cross-validation folds of the hyperparameter search.
+        """
+        return KFold(n_splits=n_splits, random_state=self._random_state, 
+                     shuffle=True)
+
+    def _strata(self):
+        """
+        Labels by which random subsets of all objects are stratified, 
+        ``None`` for regression.
+        """
+        return None
+
+    def _elementary_model(self, C, l1, columns=None):
+        """
+        Unfitted elastic net regression model for one train-test split.
+        
+        PARAMETERS
+        ----------
+        C: <float>
+            Regularization parameter.
+        l1: <float>
+            l1 ratio.
+        columns: <numpy array>
+            Column positions the model is trained on. If given and 
+            ``warm_start=True``, the model starts from the coefficients of 
+            the pilot model. Default: ``None``.
+        """
+        model = ElasticNet(alpha=1/C, l1_ratio=l1,
+                           max_iter=self._max_iter, tol=self._tol,
+                           random_state=self._random_state,
+                           fit_intercept=sparse.issparse(self._data))
+        if columns is not None and (C, l1) in self._pilot_coef:
+            model.set_params(warm_start=True)
+            model.coef_ = self._pilot_coef[(C, l1)][0][columns]
+        return model
+
+    def _cv_evaluate(self, C, l1, cv):
+        """
+        Cross-validated performance of one hyperparameter combination. In 
+        each fold, the features selected by the elastic net are refitted 
+        without penalty and scored on the test fold.
+        
+        PARAMETERS
+        ----------
+        C: <float>
+            Regularization parameter.
+        l1: <float>
+            l1 ratio.
+        cv: <cross-validation splitter>
+            Folds, see ``_cv_splitter()``.
+            
+        RETURNS
+        -------
+        <tuple>
+            - First entry: average R2 score over the folds.
+            - Second entry: average percentage of zero weights.
+            Both are ``NaN`` if no feature was selected in any fold.
+        """
+        scores = []
+        zeros = []
+        for fold, (train, test) in enumerate(
+                cv.split(np.zeros(self._data.shape[0]), self._target)):
+            # Folds are capped like the train-test splits of the models
+            train = self._cap_rows(train, self._train_size, fold)
+            test = self._cap_rows(test, self._test_size, fold)
+            # Find those parameters that are 0
+            train_data, test_data_split = self._split_data(
+                train, test, self._split_columns(train))
+            train_target = self._target[train]
+            test_target = self._target[test]
+
+            sgd =  ElasticNet(alpha=1/C, l1_ratio=l1,
+                               max_iter=5000, 
+                               random_state=self._random_state, \
+                               fit_intercept=sparse.issparse(
+                                   self._data)).\
+                               fit(train_data, train_target)
+
+            mod_coef = sgd.coef_.reshape(1, len(sgd.coef_))
+            params = np.where(mod_coef != 0)[1]
+
+            # if there are parameters != 0, build a predicion model and
+            # find best parameter combination w.r.t. scoring
+            if len(params) == 0:
+                scores.append(np.nan)
+                zeros.append(np.nan)
+            else:
+                zeros.append((train_data.shape[1]-len(params))\
+                              /train_data.shape[1])
+
+                train_data_1 = train_data[:,params]
+                test_data_1 = test_data_split[:, params]
+
+                model = LinearRegression().\
+                        fit(train_data_1, train_target)
+                scores.append(r2_score(test_target, \
+                                model.predict(test_data_1)))
+
+        return np.nanmean(scores), np.nanmean(zeros)
 
     def _par_selection(self,
                     C,
@@ -1759,7 +4228,7 @@ class RENT_Regression(RENT_Base):
             Second entry: suggested `l1 ratio`.
             
         """
-        skf = KFold(n_splits=n_splits, random_state=self._random_state, shuffle=True)
+        skf = self._cv_splitter(n_splits)
         scores_df = pd.DataFrame(np.zeros, index=l1_ratios, columns=C)
         zeros_df = pd.DataFrame(np.zeros, index=l1_ratios, columns=C)
 
@@ -1772,53 +4241,10 @@ class RENT_Regression(RENT_Base):
             l1: current l1 ratio in the parallelization framework.
             """
             for reg in C:
-                scores = []
-                zeros = []
-                for train, test in skf.split(self._data, self._target):
-                    # Find those parameters that are 0
-                    if self._scale == True:
-                        sc = StandardScaler()
-                        train_data = sc.fit_transform(self._data.iloc[train,:])
-                        train_target = self._target[train]
-                        test_data_split = sc.transform(self._data.iloc[test,:])
-                        test_target = self._target[test]
-                    elif self._scale == False:
-                        train_data = self._data.iloc[train,:].values
-                        train_target = self._target[train]
-                        test_data_split = self._data.iloc[test,:].values
-                        test_target = self._target[test]
-
-                    sgd =  ElasticNet(alpha=1/reg, l1_ratio=l1,
-                                       max_iter=5000, 
-                                       random_state=self._random_state, \
-                                       fit_intercept=False).\
-                                       fit(train_data, train_target)
-
-                    mod_coef = sgd.coef_.reshape(1, len(sgd.coef_))
-                    params = np.where(mod_coef != 0)[1]
-
-                    # if there are parameters != 0, build a predicion model and
-                    # find best parameter combination w.r.t. scoring
-                    if len(params) == 0:
-                        scores.append(np.nan)
-                        zeros.append(np.nan)
-                    else:
-                        zeros.append((len(self._data.columns)-len(params))\
-                                      /len(self._data.columns))
+                scores_df.loc[l1, reg], zeros_df.loc[l1, reg] = \
+                    self._cv_evaluate(reg, l1, skf)
 
-                        train_data_1 = train_data[:,params]
-                        test_data_1 = test_data_split[:, params]
-
-                        model = LinearRegression().\
-                                fit(train_data_1, train_target)
-                        scores.append(r2_score(test_target, \
-                                        model.predict(test_data_1)))
-
-                scores_df.loc[l1, reg] = np.nanmean(scores)
-                zeros_df.loc[l1, reg] = np.nanmean(zeros)
-
-        Parallel(n_jobs=-1, verbose=0, backend="threading")(
-             map(delayed(run_parallel), l1_ratios))
+        self._parallel(run_parallel, l1_ratios)
 
         s_arr = scores_df.stack()
         if len(np.unique(s_arr))==1:
@@ -1871,6 +4297,13 @@ class RENT_Regression(RENT_Base):
         """
         # self._AIC_df = pd.DataFrame(np.zeros, index=l1_ratios, columns=C) 
         self._BIC_df = pd.DataFrame(np.zeros, index=l1_ratios, columns=C) 
+        # One block for all models, capped like the train objects of the
+        # models
+        rows = self._cap_rows(np.arange(self._data.shape[0]), 
+                              self._train_size, 0)
+        train_data = self._split_data(rows)[0]
+        train_target = np.asarray(self._target)[rows]
+
         def run_parallel(l1):
             """
             Parallel computation of for ``K`` * ``C`` * ``l1_ratios`` models.
@@ -1879,40 +4312,29 @@ class RENT_Regression(RENT_Base):
             l1: current l1 ratio in the parallelization framework.
             """
             for reg in C:
-                if self._scale == True:
-                    sc = StandardScaler()
-                    train_data = sc.fit_transform(self._data)
-                    train_target = self._target
-                    
-                elif self._scale == False:
-                    train_data = self._data.values
-                    train_target = self._target
-                    
-
                 sgd =  ElasticNet(alpha=1/reg, l1_ratio=l1,
                                        max_iter=5000, 
                                        random_state=self._random_state, \
-                                       fit_intercept=False).\
+                                       fit_intercept=sparse.issparse(
+                                           self._data)).\
                                        fit(train_data, train_target)
 
                 mod_coef = sgd.coef_.reshape(1, len(sgd.coef_))
                 #params = np.where(mod_coef != 0)[1]
-                self.test_coef = mod_coef
                 num_params = len(np.where(mod_coef != 0)[1]) + 1
                 
                 pred = sgd.predict(train_data)
                 #log_likelihood = log_loss(y_true=train_target, y_pred=pred, normalize=False)
                 
-                sigma_2 = np.var(self._target, ddof=1)
-                SSE = np.sum((pred - self._target)**2)
+                sigma_2 = np.var(train_target, ddof=1)
+                SSE = np.sum((pred - train_target)**2)
                 n = len(pred)
                 
                 # AIC = n * np.log(2*np.pi *sigma_2) + 1/sigma_2 * SSE + 2*num_params
                 # self._AIC_df.loc[l1, reg] = AIC
                 self._BIC_df.loc[l1,reg] = n * np.log(2*np.pi *sigma_2) + 1/sigma_2 * SSE + np.log(n) * num_params 
                 
-        Parallel(n_jobs=-1, verbose=1, backend="threading")(
-             map(delayed(run_parallel), l1_ratios))
+        self._parallel(run_parallel, l1_ratios, verbose=1)
 
         
         best_combination_row, best_combination_col = np.where(self._BIC_df == \
@@ -1936,60 +4358,150 @@ class RENT_Regression(RENT_Base):
                 by the user but is used for an internal parallelization.
         """
 
-        # Loop through all C
-        for C in self._C:
-            # Loop through requested number of tt splits
-            for l1 in self._l1_ratios:
-                
-                if self._random_state is None:
-                    X_train, X_test, y_train, y_test = train_test_split(
-                              self._data, self._target,
-                              test_size=self._random_testsizes[K],
-                              random_state=None)
-                else:
-                    X_train, X_test, y_train, y_test = train_test_split(
-                              self._data, self._target,
-                              test_size=self._random_testsizes[K],
-                              random_state=K)
-
-                self._X_test = X_test
-
-                if self._scale == True:
-                    sc = StandardScaler()
-                    sc.fit(X_train)
-                    X_train_std = sc.transform(X_train)
-                    X_test_std = sc.transform(X_test)
-                if self._scale == False:
-                    X_train_std = X_train.copy().values
-                    X_test_std = X_test.copy().values
-
-                if self._verbose > 1:
-                    print('l1 = ', l1, 'C = ', C, ', TT split = ', K)
-
-                model = ElasticNet(alpha=1/C, l1_ratio=l1,
-                                       max_iter=5000, random_state=self._random_state, \
-                                       fit_intercept=False).\
-                                       fit(X_train_std, y_train)
-
-                # Get all weights (coefficients). Those that were selected
-                # are non-zero, otherwise zero
-                mod_coef = model.coef_.reshape(1, len(model.coef_))
-                self._weight_dict[(C, l1, K)] = mod_coef
-                self._weight_list.append(mod_coef)
-
-                pred = model.predict(X_test_std)
-                abs_error_df = pd.DataFrame({'abs error': abs(y_test-pred)})
-                abs_error_df.index = X_test.index
-                self._predictions_abs_errors[(C, l1, K)] = abs_error_df
-
-                score = r2_score(y_test,pred)
-                self._score_dict[(C, l1, K)] = score
-                self._score_list.append(score)
-    
-    def train(self):
+        if self._engine == 'path' and self._subspace is None and \
+                not sparse.issparse(self._data):
+            self._run_path(K)
+            return
+
+        # Loop through the (C, l1) combinations that are trained
+        for C, l1 in self._cells:
+            tic = self._timer.tic()
+            
+            train_ind, test_ind = self._train_test_rows(K)
+
+            columns = self._split_columns(train_ind)
+            if self._subspace is not None:
+                columns = self._draw_subspace(columns, K, C, l1)
+            tic = self._timer.toc('split', tic)
+            X_train_std, X_test_std = self._split_data(train_ind, test_ind,
+                                                       columns)
+            y_train = np.asarray(self._target)[train_ind]
+            y_test = np.asarray(self._target)[test_ind]
+            tic = self._timer.toc('scaling', tic)
+
+            if self._verbose > 1:
+                print('l1 = ', l1, 'C = ', C, ', TT split = ', K)
+
+            start = time.time()
+            model = self._elementary_model(C, l1, columns).\
+                                   fit(X_train_std, y_train)
+            self._record_fit(C, l1, K, model, time.time() - start)
+            tic = self._timer.toc('fit', tic)
+
+            pred = model.predict(X_test_std)
+            tic = self._timer.toc('score', tic)
+            self._store_model(C, l1, K, columns, model.coef_, test_ind, 
+                              y_test, pred)
+            self._timer.toc('merge', tic)
+
+    def _fit_pilots(self, cells):
+        """
+        The path engine starts each model from the solution at the next 
+        stronger penalty, hence it needs no pilot models.
+        """
+        if self._engine == 'path' and self._subspace is None and \
+                not sparse.issparse(self._data):
+            self._pilot_coef = {}
+            return
+        super()._fit_pilots(cells)
+
+    def _train_test_rows(self, K):
+        """
+        Row positions of train and test objects of train-test split ``K``.
+        """
+        if self._random_state is None:
+            train_ind, test_ind = train_test_split(
+                      np.arange(self._data.shape[0]),
+                      test_size=self._random_testsizes[K],
+                      random_state=None)
+        else:
+            train_ind, test_ind = train_test_split(
+                      np.arange(self._data.shape[0]),
+                      test_size=self._random_testsizes[K],
+                      random_state=K)
+        train_ind = self._cap_rows(train_ind, self._train_size, K)
+        test_ind = self._cap_rows(test_ind, self._test_size, K)
+        return train_ind, test_ind
+
+    def _run_path(self, K):
+        """
+        Path engine (``engine='path'``): compute the models of all trained
+        (C, l1) combinations on train-test split ``K`` with one coordinate 
+        descent path per l1 ratio. All combinations share the split, the 
+        scaling and, for ``n > p``, the Gram matrix and ``X.T @ y``.
+        
+        PARAMETERS
+        ----------
+        K: 
+            Train-test split.
+        """
+        tic = self._timer.tic()
+        train_ind, test_ind = self._train_test_rows(K)
+        columns = self._split_columns(train_ind)
+        tic = self._timer.toc('split', tic)
+        X_train_std, X_test_std = self._split_data(train_ind, test_ind, columns)
+        # Coordinate descent runs on columns
+        X_train_std = np.asfortranarray(X_train_std)
+        y_train = np.asarray(self._target)[train_ind].astype(
+            X_train_std.dtype)
+        y_test = np.asarray(self._target)[test_ind]
+
+        if len(columns) <= self._path_gram_limit and \
+                len(train_ind) > len(columns):
+            gram = X_train_std.T @ X_train_std
+            Xy = X_train_std.T @ y_train
+        else:
+            gram, Xy = False, None
+        tic = self._timer.toc('scaling', tic)
+
+        for l1 in dict.fromkeys(l1 for _, l1 in self._cells):
+            # The path runs from the strongest to the weakest penalty
+            Cs = sorted(C for C, l in self._cells if l == l1)
+            if self._verbose > 1:
+                print('l1 = ', l1, 'C = ', Cs, ', TT split = ', K)
+            start = time.time()
+            _, coefs, _, n_iters = enet_path(
+                X_train_std, y_train, l1_ratio=l1, 
+                alphas=[1 / C for C in Cs], precompute=gram, Xy=Xy, 
+                max_iter=self._max_iter, tol=self._tol, return_n_iter=True)
+            seconds = (time.time() - start) / len(Cs)
+            tic = self._timer.toc('fit', tic)
+            # Predictions of all models at once
+            preds = X_test_std @ coefs
+            tic = self._timer.toc('score', tic)
+            for i, C in enumerate(Cs):
+                self._fit_diagnostics[(C, l1, K)] = (
+                    int(n_iters[i]), n_iters[i] < self._max_iter, seconds,
+                    np.count_nonzero(coefs[:, i]))
+                self._store_model(C, l1, K, columns, coefs[:, i], test_ind,
+                                  y_test, preds[:, i])
+            tic = self._timer.toc('merge', tic)
+
+    def _store_model(self, C, l1, K, columns, coef, test_ind, y_test, pred):
+        """
+        Store coefficients, absolute test errors and R2 score of the model 
+        of combination (``C``, ``l1``) on train-test split ``K``.
+        """
+        # Get all weights (coefficients). Those that were selected
+        # are non-zero, otherwise zero
+        self._weight_dict[(C, l1)][K, columns] = coef
+
+        abs_error_df = pd.DataFrame(
+            {'abs error': abs(y_test-pred).astype(self._dtype)})
+        abs_error_df.index = self._indices[test_ind]
+        self._predictions_abs_errors[(C, l1, K)] = abs_error_df
+
+        score = r2_score(y_test,pred)
+        self._score_dict[(C, l1, K)] = score
+        self._score_list.append(score)
+
+    def _init_ensemble_results(self):
+        """
+        Initialize the containers filled by ``run_parallel()``.
+        """
         self._predictions_abs_errors = {}
-        super().train()
 
+    @_timed('summaries')
     def get_summary_objects(self):
         """
         Each object of the dataset is a certain number between 0 (never) and ``K`` 
@@ -2104,52 +4616,68 @@ class RENT_Regression(RENT_Base):
             ax.set_title('Object: {0}'.format(obj), fontsize=10)
     
     
+    @_timed('validation')
     def _prepare_validation_study(self, test_data, test_labels, num_drawings, 
                                   num_permutations, metric=None, alpha=0.05):
         
+        # Scale once, all feature subsets below are slices of these arrays
+        drawings, columns = self._validation_columns(num_drawings)
+        train_scaled, test_scaled = self._scale_validation_data(test_data,
+                                                                columns)
+        sel_var = np.searchsorted(columns, self._sel_var)
+
         # RENT prediction
-        if self._scale == True:
-            sc = StandardScaler()
-            train_RENT = sc.fit_transform(self._data.iloc[:, self._sel_var])
-            test_RENT = sc.transform(test_data.iloc[:, self._sel_var])
-        elif self._scale == False:
-            train_RENT = self._data.iloc[:, self._sel_var].values
-            test_RENT = test_data.iloc[:, self._sel_var].values
+        train_RENT = train_scaled[:, sel_var]
+        test_RENT = test_scaled[:, sel_var]
         model = LinearRegression().fit(train_RENT,self._target)
         score = r2_score(test_labels, model.predict(test_RENT))
 
         # VS1
-        VS1 = []
-        for K in range(num_drawings):
-            # Randomly select features (# features = # RENT features selected)
-            columns = np.random.RandomState(seed=K).choice(
-                range(len(self._data.columns)), len(self._sel_var)
-            )
-
-            if self._scale == True:
-                sc = StandardScaler()
-                train_VS1 = sc.fit_transform(self._data.iloc[:, columns])
-                test_VS1 = sc.transform(test_data.iloc[:, columns])
-            elif self._scale == False:
-                train_VS1 = self._data.iloc[:, columns].values
-                test_VS1 = test_data.iloc[:, columns].values
-
-            model = LinearRegression().fit(train_VS1, self._target)
-            VS1.append(r2_score(test_labels, model.predict(test_VS1)))
+        # The data is centered once, such that each drawing only solves the
+        # least squares problem on its columns, as LinearRegression does.
+        x_mean = train_scaled.mean(axis=0)
+        y_mean = np.mean(self._target)
+        train_centered = train_scaled - x_mean
+        target_centered = np.asarray(self._target) - y_mean
+        test_centered = test_scaled - x_mean
+
+        def run_batch(batch):
+            """
+            Score the linear regression models of a batch of drawings.
+            
+            PARAMETERS
+            -----
+            batch: numbers of the drawings in this batch.
+            """
+            batch_scores = []
+            for K in batch:
+                # Drawings are with replacement. Duplicated columns do not 
+                # change the least squares predictions, but make the problem
+                # rank deficient, such that the result depends on rounding.
+                drawn = np.searchsorted(columns, np.unique(drawings[K]))
+                coef = linalg.lstsq(train_centered[:, drawn], 
+                                    target_centered)[0]
+                pred = test_centered[:, drawn] @ coef + y_mean
+                batch_scores.append(r2_score(test_labels, pred))
+            return batch_scores
+
+        batches = np.array_split(np.arange(num_drawings),
+                                 max(1, min(num_drawings,
+                                            4 * effective_n_jobs(-1))))
+        VS1 = [batch_score for batch_scores in
+               Parallel(n_jobs=-1, verbose=0, backend='threading')(
+                   map(delayed(run_batch), batches))
+               for batch_score in batch_scores]
 
         # VS2
-        sc = StandardScaler()
-        test_data.columns = self._data.columns
-        if self._scale == True:
-            train_VS2 = sc.fit_transform(self._data.iloc[:,self._sel_var])
-            test_VS2 = sc.transform(test_data.iloc[:, self._sel_var])
-        elif self._scale == False:
-            train_VS2 = self._data.iloc[:,self._sel_var].values
-            test_VS2 = test_data.iloc[:, self._sel_var].values
-
-        model = LinearRegression().fit(train_VS2,self._target)
-        VS2 = [r2_score(
-            np.random.RandomState(seed=K).permutation(test_labels),\
-            model.predict(test_VS2)) for K in range(num_permutations)]
-        return score, VS1, VS2
+        # The predictions of the RENT model are fixed, only the labels are
+        # permuted. The total sum of squares is invariant to permutation.
+        permuted = self._permuted_labels(test_labels, num_permutations)
+        pred = model.predict(test_RENT)
+        ss_res = np.sum((permuted - pred) ** 2, axis=1)
+        ss_tot = np.sum((permuted[0, :] - np.mean(permuted[0, :])) ** 2) \
+            if num_permutations > 0 else np.nan
+        VS2 = 1 - ss_res / ss_tot
+
+        return score, np.asarray(VS1), VS2
     
@@ -0,0 +1,457 @@
+import sys
+sys.path.append('../src')
+from RENT import RENT
+
+import pandas as pd
+import numpy as np
+import pytest
+
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import matthews_corrcoef, accuracy_score
+from sklearn.preprocessing import StandardScaler
+from scipy import sparse
+from scipy.stats import t
+
+
+# load the data
+train_data = pd.read_csv("../examples/data/wisconsin_train.csv").iloc[:, 1:]
+train_labels = pd.read_csv("../examples/data/wisconsin_train_labels.csv").iloc[:, 1].values
+test_data = pd.read_csv("../examples/data/wisconsin_test.csv").iloc[:, 1:]
+test_labels = pd.read_csv("../examples/data/wisconsin_test_labels.csv").iloc[:, 1].values
+
+
+def test_validation_study_permutations_labels():
+    """
+    Verify that the permutation scores (VS2) of the validation study equal
+    the sklearn metrics for labels other than 0 and 1.
+    """
+    labels = np.where(train_labels == 1, 5, 2)
+    permuted_test_labels = np.where(test_labels == 1, 5, 2)
+    analysis = RENT.RENT_Classification(data=train_data,
+                                        target=labels,
+                                        C=[1],
+                                        l1_ratios=[0.5],
+                                        autoEnetParSel=False,
+                                        K=10,
+                                        random_state=0)
+    analysis.train()
+    analysis.select_features(tau_1_cutoff=0.9, tau_2_cutoff=0.9,
+                             tau_3_cutoff=0.975)
+
+    # Predictions of the RENT model of the validation study
+    _, columns = analysis._validation_columns(2)
+    train_scaled, test_scaled = analysis._scale_validation_data(test_data,
+                                                                columns)
+    sel_var = np.searchsorted(columns, analysis._sel_var)
+    model = LogisticRegression(penalty='none', max_iter=8000, solver="saga",
+                               random_state=0).fit(train_scaled[:, sel_var],
+                                                   labels)
+    pred = model.predict(test_scaled[:, sel_var])
+
+    for metric, function in [('mcc', matthews_corrcoef),
+                             ('acc', accuracy_score)]:
+        _, _, VS2 = analysis._prepare_validation_study(
+            test_data, permuted_test_labels, num_drawings=2,
+            num_permutations=20, metric=metric)
+        expected = [function(np.random.RandomState(seed=K).permutation(
+                        permuted_test_labels), pred) for K in range(20)]
+        assert np.allclose(VS2, expected)
+
+
+def test_hierarchical_second_stage():
+    """
+    Verify that the second stage of poly='hierarchical' discards the 
+    selection criteria of the first stage and selects the hyperparameters
+    again on the full grid.
+    """
+    analysis = RENT.RENT_Classification(data=train_data.iloc[:, :8],
+                                        target=train_labels,
+                                        C=[0.1, 1],
+                                        l1_ratios=[0.5, 1],
+                                        poly='hierarchical',
+                                        K=5,
+                                        random_state=0)
+    analysis.train()
+    assert analysis._data.shape[1] > 8
+    assert analysis._C[0] in [0.1, 1] and len(analysis._C) == 1
+    with pytest.raises(SystemExit):
+        analysis.get_summary_criteria()
+    selected = analysis.select_features(tau_1_cutoff=0.9, tau_2_cutoff=0.9,
+                                        tau_3_cutoff=0.975)
+    assert analysis.get_summary_criteria().shape[1] == analysis._data.shape[1]
+    assert len(selected) > 0
+
+
+def test_screening_labels_and_folds():
+    """
+    Verify that screening gives the same features for string labels as for
+    0/1 labels and that, with screening_per_split=True, the features of a
+    cross-validation fold only depend on its train objects.
+    """
+    string_labels = np.where(train_labels == 1, 'malignant', 'benign')
+    for screening in ['logistic', 't', 'correlation']:
+        analyses = [RENT.RENT_Classification(data=train_data,
+                                             target=target,
+                                             C=[1],
+                                             l1_ratios=[0.5],
+                                             autoEnetParSel=False,
+                                             screening=screening,
+                                             screening_size=10,
+                                             screening_per_split=True,
+                                             K=5,
+                                             random_state=0)
+                    for target in [train_labels, string_labels]]
+        assert np.array_equal(analyses[0]._active_features,
+                              analyses[1]._active_features)
+
+    train = np.arange(200)
+    fold = RENT.RENT_Classification(data=train_data.iloc[train, :],
+                                    target=train_labels[train],
+                                    C=[1],
+                                    l1_ratios=[0.5],
+                                    autoEnetParSel=False,
+                                    screening='correlation',
+                                    screening_size=10,
+                                    K=5,
+                                    random_state=0)
+    assert np.array_equal(analyses[1]._split_columns(train),
+                          fold._active_features)
+
+
+def test_coarse_pass_screening_per_split():
+    """
+    Verify that, after a coarse pass, the per-split screening only keeps
+    features that survived the coarse pass.
+    """
+    analysis = RENT.RENT_Classification(data=train_data,
+                                        target=train_labels,
+                                        C=[0.1, 1],
+                                        l1_ratios=[0.5, 1],
+                                        screening='correlation',
+                                        screening_size=8,
+                                        screening_per_split=True,
+                                        coarse_pass={'K': 5, 
+                                                     'tau_1_cutoff': 0.5},
+                                        K=10,
+                                        random_state=0)
+    analysis.train()
+    assert len(analysis._C) == 1 and len(analysis._l1_ratios) == 1
+    columns = analysis._split_columns(np.arange(200))
+    assert len(columns) == 8
+    assert np.all(np.isin(columns, analysis._active_features))
+    weights = analysis._weight_dict[(analysis._C[0], analysis._l1_ratios[0])]
+    assert np.all(np.isin(np.where(weights.any(axis=0))[0],
+                          analysis._active_features))
+
+
+def test_subspace_criteria():
+    """
+    Verify that, in random-subspace mode, the selection criteria of each 
+    feature are computed over the models the feature was eligible for.
+    """
+    analysis = RENT.RENT_Classification(data=train_data,
+                                        target=train_labels,
+                                        C=[1],
+                                        l1_ratios=[0.5],
+                                        autoEnetParSel=False,
+                                        subspace=0.5,
+                                        K=20,
+                                        random_state=0)
+    analysis.train()
+    analysis.select_features(tau_1_cutoff=0.9, tau_2_cutoff=0.9,
+                             tau_3_cutoff=0.975)
+    summary = analysis.get_summary_criteria()
+
+    weights = analysis._weight_dict[(1, 0.5)]
+    eligible = analysis._eligible_dict[(1, 0.5)]
+    # Each model draws half of the features
+    assert np.all(eligible.sum(axis=1) == 15)
+    for j in range(weights.shape[1]):
+        w = weights[eligible[:, j], j]
+        n = len(w)
+        tau_3 = t.cdf(abs(np.mean(w) / np.sqrt(np.var(w) / n)), n - 1) \
+            if np.var(w) > 0 else 0
+        assert np.isclose(summary.iloc[0, j], np.count_nonzero(w) / n)
+        assert np.isclose(summary.iloc[1, j], 
+                          np.abs(np.sum(np.sign(w))) / n)
+        assert np.isclose(summary.iloc[2, j], tau_3)
+
+
+def test_successive_halving():
+    """
+    Verify that successive halving selects a grid combination that was 
+    trained with all K models.
+    """
+    C = [0.01, 0.1, 1, 10]
+    l1_ratios = [0.25, 0.5, 1]
+    analysis = RENT.RENT_Classification(data=train_data,
+                                        target=train_labels,
+                                        C=C,
+                                        l1_ratios=l1_ratios,
+                                        autoEnetParSel=False,
+                                        successive_halving={'min_K': 5,
+                                                            'factor': 2},
+                                        K=20,
+                                        random_state=0)
+    analysis.train()
+    best_C, best_l1_ratio = analysis._best_C, analysis._best_l1_ratio
+    assert best_C in C and best_l1_ratio in l1_ratios
+    assert analysis._n_models[(best_C, best_l1_ratio)] == 20
+    assert min(analysis._n_models.values()) == 5
+    assert len(analysis.select_features(tau_1_cutoff=0.9, tau_2_cutoff=0.9,
+                                        tau_3_cutoff=0.975)) > 0
+
+    # Pruned combinations are rejected, combinations with K models are not
+    pruned = [cell for cell, n in analysis._n_models.items() if n < 20]
+    with pytest.raises(SystemExit, match='pruned by successive halving'):
+        analysis.set_enet_params(*pruned[0])
+    analysis.set_enet_params(best_C, best_l1_ratio)
+
+
+def test_model_based_search():
+    """
+    Verify that the model-based search returns the best evaluated 
+    combination, which lies within the range of the given grid.
+    """
+    analysis = RENT.RENT_Classification(data=train_data,
+                                        target=train_labels,
+                                        C=[0.01, 10],
+                                        l1_ratios=[0.25, 1],
+                                        model_based_search={
+                                            'n_evaluations': 8,
+                                            'n_initial': 4,
+                                            'batch_size': 2},
+                                        K=5,
+                                        random_state=0)
+    C, l1_ratio = analysis.fit_hyperparameters()
+    history = analysis.get_search_history()
+    assert len(history) == 8
+    assert 0.01 <= C <= 10 and 0.25 <= l1_ratio <= 1
+    best = history.iloc[np.argmax(history['harmonic mean'].values)]
+    assert np.isclose(best['C'], C) and np.isclose(best['l1_ratio'], l1_ratio)
+
+
+def test_enet_logistic_saga():
+    """
+    Verify that the coordinate descent solver of classifier='enet_cd' 
+    finds the saga solution. With tight tolerances, coefficients agree to
+    1e-6 and the supports are identical.
+    """
+    X = StandardScaler().fit_transform(train_data.values)
+    for C, l1_ratio in [(0.1, 0), (0.1, 0.5), (1, 0.5), (1, 1)]:
+        model = RENT._EnetLogistic(C=C, l1_ratio=l1_ratio, max_iter=5000,
+                                   tol=1e-8).fit(X, train_labels)
+        expected = LogisticRegression(penalty='elasticnet', solver='saga',
+                                      C=C, l1_ratio=l1_ratio, tol=1e-10,
+                                      max_iter=100000).fit(X, train_labels)
+        assert model.converged_
+        assert np.allclose(model.coef_, expected.coef_, rtol=0, atol=1e-6)
+        assert np.allclose(model.intercept_, expected.intercept_, rtol=0,
+                           atol=1e-6)
+        assert np.array_equal(model.coef_ != 0, expected.coef_ != 0)
+
+
+def test_solver_policy_auto():
+    """
+    Verify the accuracy that the docstring of solver_policy='auto' states
+    for the table solvers, that their tolerances follow the solver 
+    tolerance in use and that the table counts the capped train objects.
+    """
+    analysis = RENT.RENT_Classification(data=train_data,
+                                        target=train_labels,
+                                        C=[0.1, 1, 10],
+                                        l1_ratios=[0, 1],
+                                        autoEnetParSel=False,
+                                        solver_policy='auto',
+                                        K=5,
+                                        random_state=0)
+    train = np.arange(0, len(train_labels), 2)
+    X, _ = analysis._split_data(train)
+    y = train_labels[train]
+    for C in [0.1, 1, 10]:
+        for l1_ratio, solver in [(0, 'lbfgs'), (1, 'liblinear')]:
+            model = analysis._elementary_model(C, l1_ratio).fit(X, y)
+            assert analysis._solver_choices[(C, l1_ratio)] == solver
+            exact = RENT._EnetLogistic(C=C, l1_ratio=l1_ratio, 
+                                       max_iter=100000, tol=1e-12).fit(X, y)
+            assert np.abs(model.coef_ - exact.coef_).max() < \
+                2e-2 * np.abs(exact.coef_).max()
+
+    analysis._tol = 1e-2
+    assert np.isclose(analysis._elementary_model(1, 0).tol, 1e-4)
+    assert np.isclose(analysis._elementary_model(1, 1).tol, 1e-4)
+
+    # Objects per feature refer to the capped train objects
+    assert analysis._choose_solver(0.5)['solver'] == 'saga'
+    analysis._train_size = train_data.shape[1] - 1
+    assert analysis._choose_solver(0.5)['solver'] == 'enet_cd'
+    assert analysis._choose_solver(1)['solver'] == 'enet_cd'
+
+
+def test_sparse_data():
+    """
+    Verify that CSR and CSC data give the selection and permutation scores
+    of dense data. Sparse data is scaled without centering, hence only 
+    classifier='enet_cd', which solves to tolerance, is compared with dense
+    data. saga stops early on uncentered data, hence its CSR and CSC fits
+    are compared with each other.
+    """
+    def run(data, test, classifier):
+        analysis = RENT.RENT_Classification(data=data,
+                                            target=train_labels,
+                                            C=[1],
+                                            l1_ratios=[0.5],
+                                            autoEnetParSel=False,
+                                            classifier=classifier,
+                                            K=10,
+                                            random_state=0)
+        analysis.train()
+        selected = analysis.select_features(tau_1_cutoff=0.9, 
+                                            tau_2_cutoff=0.9,
+                                            tau_3_cutoff=0.975)
+        _, _, VS2 = analysis._prepare_validation_study(
+            test, test_labels, num_drawings=2, num_permutations=20, 
+            metric='mcc')
+        return selected, analysis._weight_dict[(1, 0.5)], np.asarray(VS2)
+
+    expected = run(train_data.values, test_data, 'enet_cd')
+    for matrix in [sparse.csr_matrix, sparse.csc_matrix]:
+        result = run(matrix(train_data.values), matrix(test_data.values),
+                     'enet_cd')
+        assert np.array_equal(result[0], expected[0])
+        assert np.allclose(result[1], expected[1], rtol=0, atol=1e-3)
+        assert np.allclose(result[2], expected[2])
+
+    results = [run(matrix(train_data.values), matrix(test_data.values),
+                   'logreg')
+               for matrix in [sparse.csr_matrix, sparse.csc_matrix]]
+    assert len(results[0][0]) > 0
+    for first, second in zip(*results):
+        assert np.allclose(first, second)
+
+
+def test_float32():
+    """
+    Verify that dtype=np.float32 stores float32 weights and gives the 
+    selection of float64 for saga and for classifier='enet_cd', which 
+    computes in float64 internally.
+    """
+    for classifier in ['logreg', 'enet_cd']:
+        results = []
+        for dtype in [np.float64, np.float32]:
+            analysis = RENT.RENT_Classification(data=train_data,
+                                                target=train_labels,
+                                                C=[1],
+                                                l1_ratios=[0.5],
+                                                autoEnetParSel=False,
+                                                classifier=classifier,
+                                                K=10,
+                                                dtype=dtype,
+                                                random_state=0)
+            analysis.train()
+            results.append((analysis.select_features(tau_1_cutoff=0.9,
+                                                     tau_2_cutoff=0.9,
+                                                     tau_3_cutoff=0.975),
+                            analysis._weight_dict[(1, 0.5)]))
+        assert results[1][1].dtype == np.float32
+        assert np.array_equal(results[0][0], results[1][0])
+
+
+def test_deferred_hyperparameters():
+    """
+    Verify that construction does not run the hyperparameter search, and 
+    that fit_hyperparameters() on its own gives the cross-validation 
+    matrices and combination of train().
+    """
+    def construct():
+        return RENT.RENT_Classification(data=train_data,
+                                        target=train_labels,
+                                        C=[0.1, 1],
+                                        l1_ratios=[0.5, 1],
+                                        K=5,
+                                        random_state=0)
+
+    analysis = construct()
+    assert analysis._hyperparameters_fitted == False
+    assert analysis._C == [0.1, 1] and analysis._l1_ratios == [0.5, 1]
+    assert analysis.get_phase_times()['calls'].get('hyperparameters', 0) == 0
+    with pytest.raises(SystemExit):
+        analysis.get_cv_matrices()
+
+    parameters = analysis.fit_hyperparameters()
+    trained = construct()
+    trained.train()
+    assert parameters == trained.get_enet_params()
+    for first, second in zip(analysis.get_cv_matrices(),
+                             trained.get_cv_matrices()):
+        assert np.allclose(first.values.astype(float),
+                           second.values.astype(float), equal_nan=True)
+
+
+def test_warm_start():
+    """
+    Verify that warm-started models reach the selection of cold-started 
+    models and that the capped pilot objects keep both classes.
+    """
+    def run(warm_start):
+        analysis = RENT.RENT_Classification(data=train_data,
+                                            target=train_labels,
+                                            C=[0.1, 1],
+                                            l1_ratios=[0.5],
+                                            autoEnetParSel=False,
+                                            classifier='enet_cd',
+                                            train_size=100,
+                                            warm_start=warm_start,
+                                            K=10,
+                                            random_state=0)
+        analysis.train()
+        selected = analysis.select_features(tau_1_cutoff=0.9,
+                                            tau_2_cutoff=0.9,
+                                            tau_3_cutoff=0.975)
+        return analysis, selected
+
+    cold, expected = run(False)
+    warm, selected = run(True)
+    assert cold._pilot_coef == {}
+    assert set(warm._pilot_coef) == {(0.1, 0.5), (1, 0.5)}
+    assert np.array_equal(selected, expected)
+    for cell in warm._pilot_coef:
+        assert np.allclose(warm._weight_dict[cell], cold._weight_dict[cell],
+                           rtol=0, atol=1e-3)
+
+    rows = warm._cap_rows(np.arange(len(train_labels)), 100, 0,
+                          stratify=warm._strata())
+    assert np.isclose(np.mean(train_labels[rows]), np.mean(train_labels),
+                      atol=0.01)
+
+
+def test_enet_logistic_line_search(monkeypatch):
+    """
+    Verify that classifier='enet_cd' keeps the current solution and 
+    reports non-convergence if halving the step does not decrease the 
+    objective.
+    """
+    def diverging_path(X, y, coef_init, **kwargs):
+        return None, (coef_init + 100)[:, np.newaxis], None, [1]
+
+    X = StandardScaler().fit_transform(train_data.values)
+    monkeypatch.setattr(RENT, 'enet_path', diverging_path)
+    model = RENT._EnetLogistic(C=1, l1_ratio=0.5).fit(X, train_labels)
+    mean = np.mean(train_labels)
+    assert not model.converged_
+    assert np.all(model.coef_ == 0)
+    assert np.isclose(model.intercept_[0], np.log(mean / (1 - mean)))
+
+
+def test_enet_logistic_inner_convergence():
+    """
+    Verify that classifier='enet_cd' reports non-convergence if an inner 
+    coordinate descent stops at max_iter.
+    """
+    X = StandardScaler().fit_transform(train_data.values)
+    model = RENT._EnetLogistic(C=1, l1_ratio=0.5, max_iter=1, 
+                               tol=1e-8).fit(X, train_labels)
+    assert not model.converged_
+    model = RENT._EnetLogistic(C=1, l1_ratio=0.5, max_iter=5000, 
+                               tol=1e-8).fit(X, train_labels)
+    assert model.converged_
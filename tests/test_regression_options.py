@@ -0,0 +1,357 @@
+import sys
+sys.path.append('../src')
+from RENT import RENT
+
+import json
+import pandas as pd
+import numpy as np
+from scipy import sparse
+
+from sklearn.datasets import make_regression
+from sklearn.preprocessing import StandardScaler, PolynomialFeatures
+
+
+# load the data
+data = make_regression(n_samples=150, n_features=100, n_informative=10, random_state=0, shuffle=False)
+my_data = pd.DataFrame(data[0])
+my_target = data[1]
+
+
+def run_selection(data, **kwargs):
+    """
+    Train a small RENT regression ensemble and return its selected features.
+    """
+    analysis = RENT.RENT_Regression(data=data,
+                                    target=my_target,
+                                    C=[1],
+                                    l1_ratios=[0.9],
+                                    autoEnetParSel=False,
+                                    K=20,
+                                    random_state=0,
+                                    **kwargs)
+    analysis.train()
+    return analysis.select_features(tau_1_cutoff=0.9, tau_2_cutoff=0.9,
+                                    tau_3_cutoff=0.975)
+
+
+def test_data_formats(tmp_path):
+    """
+    Verify that sparse matrices, memory maps, .npy paths and column-major 
+    arrays give the same selection as a dense dataframe. Sparse data is 
+    scaled without centering, but fitted with an intercept instead.
+    """
+    expected = run_selection(my_data)
+    assert len(expected) > 0
+
+    path = str(tmp_path / 'data.npy')
+    np.save(path, my_data.values)
+    memmap = np.load(path, mmap_mode='r')
+
+    for data in [my_data.values, np.asfortranarray(my_data.values),
+                 sparse.csr_matrix(my_data.values),
+                 sparse.csc_matrix(my_data.values), memmap, path]:
+        assert np.array_equal(run_selection(data), expected)
+
+
+def test_row_caps():
+    """
+    Verify that train_size and test_size cap the objects of each model and
+    that the capped rows stay disjoint subsets of the split.
+    """
+    analysis = RENT.RENT_Regression(data=my_data,
+                                    target=my_target,
+                                    C=[1],
+                                    l1_ratios=[0.9],
+                                    autoEnetParSel=False,
+                                    K=10,
+                                    train_size=60,
+                                    test_size=20,
+                                    random_state=0)
+    analysis.train()
+    for K in range(10):
+        train_ind, test_ind = analysis._train_test_rows(K)
+        assert len(train_ind) == 60 and len(test_ind) == 20
+        assert len(np.intersect1d(train_ind, test_ind)) == 0
+    assert len(analysis.select_features(tau_1_cutoff=0.9, tau_2_cutoff=0.9,
+                                        tau_3_cutoff=0.975)) > 0
+
+
+def test_chunked_scaling(monkeypatch):
+    """
+    Verify that scaling statistics accumulated over blocks of rows equal 
+    those of a single fit.
+    """
+    analysis = RENT.RENT_Regression(data=my_data,
+                                    target=my_target,
+                                    C=[1],
+                                    l1_ratios=[0.9],
+                                    autoEnetParSel=False,
+                                    K=5,
+                                    random_state=0)
+    monkeypatch.setattr(RENT.RENT_Regression, '_row_chunk_size', 7)
+    block = my_data.values[:100]
+    scaler = analysis._fit_scaler(block.copy())
+    expected = StandardScaler().fit(block)
+    assert np.allclose(scaler.mean_, expected.mean_)
+    assert np.allclose(scaler.scale_, expected.scale_)
+    assert np.allclose(scaler.transform(block.copy()), 
+                       expected.transform(block))
+
+
+def test_path_engine():
+    """
+    Verify that the path engine selects the same features as the 
+    elementary engine, with weights that agree within the solver tolerance.
+    Weights close to 0 may differ in whether they are exactly 0.
+    """
+    analyses = [RENT.RENT_Regression(data=my_data,
+                                     target=my_target,
+                                     C=[0.1, 1, 10],
+                                     l1_ratios=[0.5, 0.9],
+                                     autoEnetParSel=False,
+                                     K=10,
+                                     engine=engine,
+                                     random_state=0)
+                for engine in ['elementary', 'path']]
+    for analysis in analyses:
+        analysis.train()
+    for cell, weights in analyses[0]._weight_dict.items():
+        path_weights = analyses[1]._weight_dict[cell]
+        assert np.allclose(weights, path_weights, rtol=0,
+                           atol=1e-2 * np.abs(weights).max())
+    selected = [analysis.select_features(tau_1_cutoff=0.9, tau_2_cutoff=0.9,
+                                         tau_3_cutoff=0.975)
+                for analysis in analyses]
+    assert np.array_equal(selected[0], selected[1])
+
+
+def test_fit_diagnostics():
+    """
+    Verify that the fit diagnostics hold one row per model, whose number of
+    nonzero weights matches the stored weights, and that the summary 
+    counts the models of each combination.
+    """
+    analysis = RENT.RENT_Regression(data=my_data,
+                                    target=my_target,
+                                    C=[0.1, 1],
+                                    l1_ratios=[0.5, 0.9],
+                                    autoEnetParSel=False,
+                                    K=5,
+                                    random_state=0)
+    analysis.train()
+    diagnostics = analysis.get_fit_diagnostics()
+    assert len(diagnostics) == 20
+    assert list(diagnostics.columns) == ['C', 'l1_ratio', 'K', 'n_iter',
+                                         'converged', 'time', 'nonzero']
+    for _, row in diagnostics.iterrows():
+        weights = analysis._weight_dict[(row['C'], row['l1_ratio'])]
+        assert row['nonzero'] == np.count_nonzero(weights[int(row['K'])])
+        assert row['n_iter'] > 0 and row['time'] >= 0
+    assert diagnostics['converged'].all()
+
+    summary = analysis.get_fit_diagnostics(summary=True)
+    assert len(summary) == 4
+    assert (summary['models'] == 5).all()
+    assert (summary['not_converged'] == 0).all()
+
+
+def test_phase_times(tmp_path):
+    """
+    Verify that the phase times count one call per model for the phases of
+    the models, that the JSON export matches get_phase_times() and that 
+    repeated training adds no workers.
+    """
+    analysis = RENT.RENT_Regression(data=my_data,
+                                    target=my_target,
+                                    C=[0.1, 1],
+                                    l1_ratios=[0.5, 0.9],
+                                    autoEnetParSel=False,
+                                    K=5,
+                                    random_state=0)
+    analysis.train()
+    analysis.select_features(tau_1_cutoff=0.9, tau_2_cutoff=0.9,
+                             tau_3_cutoff=0.975)
+    times = analysis.get_phase_times()
+    assert list(times.columns) == ['wall', 'cpu', 'calls']
+    for phase in ['split', 'scaling', 'fit', 'score', 'merge']:
+        assert times.loc[phase, 'calls'] == 20
+    for phase in ['setup', 'aggregation', 'selection']:
+        assert times.loc[phase, 'calls'] == 1
+    assert (times['wall'] >= 0).all() and (times['cpu'] >= 0).all()
+
+    per_worker = analysis.get_phase_times(per_worker=True)
+    assert np.allclose(per_worker.groupby(level='phase')['wall'].sum(),
+                       times['wall'])
+
+    path = str(tmp_path / 'times.json')
+    document = json.loads(analysis.export_phase_times(path))
+    with open(path) as f:
+        assert json.load(f) == document
+    for phase, row in times.iterrows():
+        assert document['phases'][phase]['calls'] == row['calls']
+        assert np.isclose(document['phases'][phase]['wall'], row['wall'])
+    assert sum(worker['fit']['calls'] 
+               for worker in document['workers'].values()
+               if 'fit' in worker) == 20
+
+    # Training again adds to the workers of the first training
+    workers = set(per_worker.index.get_level_values('worker'))
+    analysis.train()
+    per_worker = analysis.get_phase_times(per_worker=True)
+    assert set(per_worker.index.get_level_values('worker')) == workers
+    assert analysis.get_phase_times().loc['fit', 'calls'] == 40
+
+
+def test_polynomial_design():
+    """
+    Verify that the virtual polynomial design has the columns, column order
+    and names of sklearn's PolynomialFeatures.
+    """
+    X = my_data.values[:20, :5]
+    names = ['a', 'b', 'c', 'd', 'e']
+    for interaction_only in [False, True]:
+        expected = PolynomialFeatures(interaction_only=interaction_only,
+                                      include_bias=False).fit(X)
+        design = RENT._PolynomialDesign(X, names, 
+                                        interaction_only=interaction_only,
+                                        chunk_size=4)
+        assert design.shape == (20, expected.n_output_features_)
+        assert np.allclose(design.get(), expected.transform(X))
+        columns = np.array([14, 0, 7, 3])
+        rows = np.array([5, 1, 17])
+        assert np.allclose(design.get(rows, columns),
+                           expected.transform(X)[np.ix_(rows, columns)])
+        expected_names = [name.replace(' ', '*') for name in 
+                          expected.get_feature_names_out(names)]
+        assert list(design.feature_names) == expected_names
+
+    analysis = RENT.RENT_Regression(data=my_data.iloc[:, :5],
+                                    target=my_target,
+                                    C=[1],
+                                    l1_ratios=[0.9],
+                                    autoEnetParSel=False,
+                                    poly='ON',
+                                    K=5,
+                                    random_state=0)
+    assert np.allclose(analysis._get_data(), PolynomialFeatures(
+        include_bias=False).fit_transform(my_data.values[:, :5]))
+
+
+def test_polynomial_test_data():
+    """
+    Verify that, with poly='ON', test data of the validation study gets the
+    same expanded columns as PolynomialFeatures, also when the columns come
+    from the cache or the test data changes.
+    """
+    analysis = RENT.RENT_Regression(data=my_data.iloc[:100, :5],
+                                    target=my_target[:100],
+                                    C=[1],
+                                    l1_ratios=[0.9],
+                                    autoEnetParSel=False,
+                                    poly='ON',
+                                    K=5,
+                                    random_state=0)
+    expansion = PolynomialFeatures(include_bias=False).fit(my_data.values[:, :5])
+    for test_data in [my_data.iloc[100:, :5], my_data.iloc[120:, :5]]:
+        expected = expansion.transform(test_data.values)
+        for columns in [np.array([0, 7, 19]), np.array([3, 7, 12, 19])]:
+            assert np.allclose(
+                analysis._test_data_columns(test_data, columns),
+                expected[:, columns])
+
+
+def test_feature_clusters():
+    """
+    Verify that planted near-duplicate features are merged into one 
+    cluster, that expanded criteria are those of the cluster and that test
+    data is collapsed like the train data.
+    """
+    rng = np.random.RandomState(0)
+    X = my_data.values[:, :20]
+    noise = 1e-3 * rng.standard_normal((len(X), 3))
+    planted = np.column_stack([X, 2 * X[:, 3] + noise[:, 0], 
+                               -X[:, 7] + noise[:, 1], 
+                               X[:, 3] + noise[:, 2]])
+    train, test = planted[:100], planted[100:]
+
+    for mode in ['representative', 'mean']:
+        analysis = RENT.RENT_Regression(data=train,
+                                        target=my_target[:100],
+                                        C=[1],
+                                        l1_ratios=[0.9],
+                                        autoEnetParSel=False,
+                                        cluster_threshold=0.95,
+                                        cluster_mode=mode,
+                                        K=10,
+                                        random_state=0)
+        clusters = analysis.get_feature_clusters()
+        labels = clusters['cluster'].values
+        assert len(np.unique(labels)) == 20
+        assert labels[20] == labels[3] and labels[22] == labels[3]
+        assert labels[21] == labels[7]
+        assert list(clusters['sign'].values[[20, 21, 22]]) == [1, -1, 1]
+        assert clusters['representative'].values[22] == 'f4'
+
+        # Train and test data are collapsed with the train statistics
+        center, scale = train.mean(axis=0), train.std(axis=0)
+        expected = []
+        for data in [train, test]:
+            if mode == 'representative':
+                expected.append(data[:, :20])
+            else:
+                standardized = (data - center) / scale
+                standardized[:, 21] *= -1
+                collapsed = standardized[:, :20].copy()
+                collapsed[:, 3] = standardized[:, [3, 20, 22]].mean(axis=1)
+                collapsed[:, 7] = standardized[:, [7, 21]].mean(axis=1)
+                expected.append(collapsed)
+        assert np.allclose(analysis._get_data(), expected[0])
+        assert np.allclose(analysis._test_data_columns(test, np.arange(20)),
+                           expected[1])
+
+        analysis.train()
+        analysis.select_features(tau_1_cutoff=0.9, tau_2_cutoff=0.9,
+                                 tau_3_cutoff=0.975)
+        summary = analysis.get_summary_criteria()
+        expanded = analysis.get_summary_criteria(expand=True)
+        assert expanded.shape == (3, 23)
+        for j in range(23):
+            assert np.array_equal(expanded.iloc[:, j].values,
+                                  summary.iloc[:, labels[j]].values)
+
+
+def test_float32():
+    """
+    Verify that dtype=np.float32 stores float32 weights and gives the 
+    selection of float64, for both engines.
+    """
+    for engine in ['elementary', 'path']:
+        results = []
+        for dtype in [np.float64, np.float32]:
+            analysis = RENT.RENT_Regression(data=my_data,
+                                            target=my_target,
+                                            C=[1],
+                                            l1_ratios=[0.9],
+                                            autoEnetParSel=False,
+                                            K=20,
+                                            dtype=dtype,
+                                            engine=engine,
+                                            random_state=0)
+            analysis.train()
+            results.append((analysis.select_features(tau_1_cutoff=0.9,
+                                                     tau_2_cutoff=0.9,
+                                                     tau_3_cutoff=0.975),
+                            analysis._weight_dict[(1, 0.9)]))
+        assert results[1][1].dtype == np.float32
+        assert np.array_equal(results[0][0], results[1][0])
+        assert np.allclose(results[0][1], results[1][1], rtol=0,
+                           atol=1e-5 * np.abs(results[0][1]).max())
+
+
+def test_warm_start():
+    """
+    Verify that warm-started models reach the selection of cold-started 
+    models.
+    """
+    assert np.array_equal(run_selection(my_data, warm_start=True),
+                          run_selection(my_data))